@@ -0,0 +1,149 @@
+"""
+Admission Control
+Protects the server when traffic spikes. Instead of letting requests queue
+up until clients time out, we answer straight away with:
+
+- 503 Service Unavailable when too many requests are already running
+- 429 Too Many Requests when one user goes over their rate limit
+
+Both include a Retry-After header. Full-list scans are "heavy" and get a
+smaller share of the in-flight slots, so cheap lookups by ID keep working
+even while big scans are running. Long-polls spend most of their time idle,
+so they use their own pool of slots and never block other requests.
+"""
+
+import math
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `burst` tokens and refills at
+    `rate` tokens per second. Each request takes one token.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def take(self, now):
+        """
+        Try to take one token.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is free
+        """
+        elapsed = now - self.updated_at
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Decides whether a request may run right now.
+
+    Usage:
+        rejection = controller.acquire(username, heavy, long_poll)
+        if rejection:
+            status_code, retry_after = rejection  # send 429/503
+        else:
+            try: ... handle request ...
+            finally: controller.release(heavy, long_poll)
+    """
+
+    def __init__(self, max_in_flight=64, max_heavy_in_flight=8,
+                 rate_per_second=50.0, burst=100, max_long_polls=100):
+        self.max_in_flight = max_in_flight
+        self.max_heavy_in_flight = max_heavy_in_flight
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_long_polls = max_long_polls
+
+        self._buckets = {}  # username -> TokenBucket
+        self._in_flight = 0
+        self._heavy_in_flight = 0
+        self._long_polls = 0
+        self._lock = threading.Lock()
+
+        self.admitted = 0
+        self.rejected_overload = 0
+        self.rejected_rate_limit = 0
+
+    def acquire(self, username, heavy=False, long_poll=False):
+        """
+        Try to admit a request.
+
+        Args:
+            username (str): Authenticated user (rate limits are per user)
+            heavy (bool): True for expensive requests like full-list scans
+            long_poll (bool): True for requests that mostly wait (change feed
+                with a timeout); they don't count toward max_in_flight
+
+        Returns:
+            None if admitted, otherwise (status_code, retry_after_seconds)
+        """
+        now = time.monotonic()
+        with self._lock:
+            # Check capacity first so a rejected request doesn't use up a token
+            if long_poll:
+                full = self._long_polls >= self.max_long_polls
+            else:
+                full = self._in_flight >= self.max_in_flight or \
+                    (heavy and self._heavy_in_flight >= self.max_heavy_in_flight)
+            if full:
+                self.rejected_overload += 1
+                return 503, 1
+
+            if self.rate_per_second:
+                bucket = self._buckets.get(username)
+                if bucket is None:
+                    bucket = TokenBucket(self.rate_per_second, self.burst)
+                    self._buckets[username] = bucket
+                wait = bucket.take(now)
+                if wait:
+                    self.rejected_rate_limit += 1
+                    return 429, max(1, math.ceil(wait))
+
+            if long_poll:
+                self._long_polls += 1
+            else:
+                self._in_flight += 1
+                if heavy:
+                    self._heavy_in_flight += 1
+            self.admitted += 1
+            return None
+
+    def release(self, heavy=False, long_poll=False):
+        """Give back the slot taken by acquire()."""
+        with self._lock:
+            if long_poll:
+                self._long_polls -= 1
+                return
+            self._in_flight -= 1
+            if heavy:
+                self._heavy_in_flight -= 1
+
+    def stats(self):
+        """Return current load and rejection counters as a dict."""
+        with self._lock:
+            return {
+                'in_flight': self._in_flight,
+                'heavy_in_flight': self._heavy_in_flight,
+                'max_in_flight': self.max_in_flight,
+                'max_heavy_in_flight': self.max_heavy_in_flight,
+                'long_polls': self._long_polls,
+                'max_long_polls': self.max_long_polls,
+                'rate_per_second': self.rate_per_second,
+                'burst': self.burst,
+                'admitted': self.admitted,
+                'rejected_overload': self.rejected_overload,
+                'rejected_rate_limit': self.rejected_rate_limit
+            }
@@ -84,6 +84,27 @@ def authenticate_request(auth_header: Optional[str]) -> bool:
     return validate_credentials(username, password)
 
 
+def get_authenticated_user(auth_header: Optional[str]) -> Optional[str]:
+    """
+    Get the username from a valid Basic Authentication header.
+    
+    Args:
+        auth_header (str): The Authorization header value
+    
+    Returns:
+        str: Username if the credentials are valid, None otherwise
+    """
+    if not auth_header:
+        return None
+    
+    credentials = parse_basic_auth_header(auth_header)
+    if not credentials:
+        return None
+    
+    username, password = credentials
+    return username if validate_credentials(username, password) else None
+
+
 def get_auth_error_response() -> dict:
     """
     Get a standardized authentication error response.
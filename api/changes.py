@@ -0,0 +1,90 @@
+"""
+Change Log
+Records every create, update and delete with an increasing sequence number,
+so other services can keep a copy of the transactions up to date by asking
+"what changed since N?" instead of downloading everything again.
+
+Only the most recent changes are kept. A client that falls further behind
+than that has to resync (download everything again) before following on.
+"""
+
+import itertools
+import threading
+from collections import deque
+
+
+class ChangeLog:
+    """Bounded, thread-safe list of changes that clients can wait on."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._changes = deque(maxlen=max_entries)
+        self._latest_seq = 0
+        self._condition = threading.Condition()
+
+    def record(self, op, transaction_id, data=None):
+        """
+        Add a change and wake up anyone long-polling.
+
+        Args:
+            op (str): 'create', 'update' or 'delete'
+            transaction_id (int): ID of the changed transaction
+            data (dict): The transaction after the change (before, for deletes)
+
+        Returns:
+            int: Sequence number of the change
+        """
+        with self._condition:
+            self._latest_seq += 1
+            self._changes.append({
+                'seq': self._latest_seq,
+                'op': op,
+                'id': transaction_id,
+                'data': data
+            })
+            self._condition.notify_all()
+            return self._latest_seq
+
+    def _oldest_seq(self):
+        """Sequence number of the oldest change still kept (call with the lock held)."""
+        return self._changes[0]['seq'] if self._changes else self._latest_seq + 1
+
+    def since(self, seq, limit=1000, timeout=0):
+        """
+        Get changes newer than seq, waiting up to `timeout` seconds for one
+        to arrive if there aren't any yet.
+
+        Args:
+            seq (int): Last sequence number the client has seen
+            limit (int): Most changes to return at once
+            timeout (float): Seconds to wait when nothing is new (0 = don't wait)
+
+        Returns:
+            tuple: (changes, latest_seq), or (None, latest_seq) if the client
+            needs to resync because the changes it needs were dropped
+        """
+        with self._condition:
+            if seq > self._latest_seq:
+                # Newer than anything we have (e.g. the server restarted)
+                return None, self._latest_seq
+
+            if timeout > 0 and seq == self._latest_seq:
+                self._condition.wait_for(lambda: self._latest_seq > seq, timeout)
+
+            oldest = self._oldest_seq()
+            if seq + 1 < oldest:
+                return None, self._latest_seq
+
+            start = seq + 1 - oldest
+            changes = list(itertools.islice(self._changes, start, start + limit))
+            return changes, self._latest_seq
+
+    def stats(self):
+        """Return size and sequence numbers as a dict."""
+        with self._condition:
+            return {
+                'size': len(self._changes),
+                'max_entries': self.max_entries,
+                'oldest_seq': self._oldest_seq(),
+                'latest_seq': self._latest_seq
+            }
@@ -0,0 +1,101 @@
+"""
+Export Helpers
+Turns transactions into NDJSON or CSV lines one row at a time, so the
+export endpoint can stream the whole store without building one giant
+document in memory.
+"""
+
+import csv
+import io
+import json
+
+
+# Every field a transaction has, in the order we output them
+TRANSACTION_FIELDS = ['id', 'type', 'amount', 'sender', 'receiver', 'timestamp', 'status']
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+# Rows are grouped into chunks of about this many bytes before writing
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def parse_field_list(value):
+    """
+    Parse a comma-separated ?fields= value and check it against the schema.
+
+    Args:
+        value (str): e.g. "id,amount,status" (None or empty means all fields)
+
+    Returns:
+        list: Field names in the requested order, without duplicates
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not value:
+        return list(TRANSACTION_FIELDS)
+
+    fields = []
+    for name in value.split(','):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name not in TRANSACTION_FIELDS:
+            raise ValueError(f"Unknown field '{name}'. Valid fields: {', '.join(TRANSACTION_FIELDS)}")
+        fields.append(name)
+
+    if not fields:
+        raise ValueError('No fields requested')
+    return fields
+
+
+def iter_ndjson(transactions, fields):
+    """Yield one JSON line (bytes) per transaction."""
+    for transaction in transactions:
+        row = {field: transaction.get(field) for field in fields}
+        yield (json.dumps(row, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def iter_csv(transactions, fields):
+    """Yield a CSV header line, then one CSV line (bytes) per transaction."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        line = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(fields)
+    yield flush()
+    for transaction in transactions:
+        writer.writerow([transaction.get(field) for field in fields])
+        yield flush()
+
+
+def iter_export(transactions, fields, export_format):
+    """
+    Yield the export body in chunks of roughly EXPORT_CHUNK_SIZE bytes.
+
+    Args:
+        transactions (iterable): Transactions to export
+        fields (list): Fields to include
+        export_format (str): 'ndjson' or 'csv'
+    """
+    lines = iter_csv(transactions, fields) if export_format == 'csv' else iter_ndjson(transactions, fields)
+
+    chunk = []
+    chunk_size = 0
+    for line in lines:
+        chunk.append(line)
+        chunk_size += len(line)
+        if chunk_size >= EXPORT_CHUNK_SIZE:
+            yield b''.join(chunk)
+            chunk = []
+            chunk_size = 0
+    if chunk:
+        yield b''.join(chunk)
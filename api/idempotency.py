@@ -0,0 +1,140 @@
+"""
+Idempotency Key Cache
+Remembers the response to each POST sent with an Idempotency-Key header,
+so a client that retries after a timeout gets the original answer back
+instead of creating a duplicate transaction.
+
+The cache is bounded (oldest keys are evicted first) and every key
+expires after a TTL. It is thread-safe: if two requests with the same
+key arrive at once, the second waits for the first to finish and then
+replays its response.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class IdempotencyEntry:
+    """One remembered request: pending until the first request finishes."""
+
+    __slots__ = ('fingerprint', 'created_at', 'done', 'status_code', 'response')
+
+    def __init__(self, fingerprint, created_at):
+        self.fingerprint = fingerprint
+        self.created_at = created_at
+        self.done = threading.Event()
+        self.status_code = None
+        self.response = None
+
+
+class IdempotencyCache:
+    """
+    Bounded, TTL-evicting map of idempotency key -> stored response.
+
+    Usage:
+        entry, is_owner = cache.begin(key, fingerprint)
+        if is_owner:
+            ... do the work ...
+            cache.complete(key, entry, status_code, response)
+        else:
+            cache.wait(entry)  # then replay entry.response
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=24 * 60 * 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> IdempotencyEntry, oldest first
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.conflicts = 0
+
+    def _purge(self, now):
+        """Drop expired keys, then the oldest keys if we're over capacity."""
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.created_at < self.ttl_seconds:
+                break
+            del self._entries[key]
+            self.expirations += 1
+
+        while len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def begin(self, key, fingerprint):
+        """
+        Claim a key, or find the request that already claimed it.
+
+        Args:
+            key (str): Idempotency key (should already be scoped per user)
+            fingerprint (str): Hash of the request body
+
+        Returns:
+            tuple: (entry, is_owner). is_owner is True when the caller must
+            process the request and then call complete() or abandon().
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.created_at >= self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+
+            if entry is not None:
+                if entry.fingerprint != fingerprint:
+                    self.conflicts += 1
+                else:
+                    self.hits += 1
+                return entry, False
+
+            self._purge(now)
+            entry = IdempotencyEntry(fingerprint, now)
+            self._entries[key] = entry
+            self.misses += 1
+            return entry, True
+
+    def complete(self, key, entry, status_code, response):
+        """Store the response for a key and wake up any waiting retries."""
+        entry.status_code = status_code
+        entry.response = response
+        entry.done.set()
+
+    def abandon(self, key, entry):
+        """
+        Forget a key whose request failed before producing a response,
+        so a later retry can try again.
+        """
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.done.set()
+
+    def wait(self, entry, timeout=30.0):
+        """
+        Wait for the owning request to finish.
+
+        Returns:
+            bool: True if a stored response is now available
+        """
+        entry.done.wait(timeout)
+        return entry.response is not None
+
+    def stats(self):
+        """Return hit/miss/eviction counters as a dict."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'conflicts': self.conflicts
+            }
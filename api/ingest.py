@@ -0,0 +1,123 @@
+"""
+Bulk Ingest Helpers
+Parses uploaded XML or NDJSON a chunk at a time as it comes off the socket,
+yielding one record at a time. Elements are thrown away as soon as they are
+read, so memory use stays flat no matter how big the upload is.
+"""
+
+import json
+import xml.etree.ElementTree as ET
+
+
+IMPORT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_request_body(rfile, headers, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Read a request body in pieces, handling both Content-Length and
+    Transfer-Encoding: chunked uploads.
+
+    Args:
+        rfile: The handler's input stream
+        headers: The request headers
+
+    Yields:
+        bytes: Pieces of the body as they arrive
+    """
+    if headers.get('Transfer-Encoding', '').lower() == 'chunked':
+        while True:
+            size_line = rfile.readline(1024)
+            if not size_line:
+                raise ValueError('Upload ended before the last chunk')
+            size = int(size_line.split(b';')[0].strip(), 16)
+            if size == 0:
+                # Skip any trailer headers up to the final blank line
+                while rfile.readline(1024) not in (b'\r\n', b'\n', b''):
+                    pass
+                return
+            remaining = size
+            while remaining > 0:
+                data = rfile.read(min(chunk_size, remaining))
+                if not data:
+                    raise ValueError('Upload ended in the middle of a chunk')
+                remaining -= len(data)
+                yield data
+            rfile.readline(1024)  # CRLF after the chunk data
+        return
+
+    remaining = int(headers.get('Content-Length', 0))
+    while remaining > 0:
+        data = rfile.read(min(chunk_size, remaining))
+        if not data:
+            raise ValueError('Upload ended before Content-Length bytes were received')
+        remaining -= len(data)
+        yield data
+
+
+def iter_xml_records(chunks):
+    """
+    Incrementally parse <transaction> elements from XML pieces.
+
+    Yields:
+        tuple: (record, None) for each transaction, where record is a dict
+        of child tag -> text (same shape as iter_ndjson_records)
+
+    Raises:
+        ValueError: If the XML itself is malformed
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root = None
+
+    def drain():
+        nonlocal root
+        for event, elem in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            if elem.tag != 'transaction':
+                continue
+            record = {child.tag: (child.text or '').strip() for child in elem}
+            # Drop what we've read so the tree doesn't grow with the upload
+            elem.clear()
+            root.clear()
+            yield record, None
+
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from drain()
+        parser.close()
+        yield from drain()
+    except ET.ParseError as e:
+        raise ValueError(f'Invalid XML: {e}')
+
+
+def iter_ndjson_records(chunks):
+    """
+    Incrementally parse one JSON object per line from NDJSON pieces.
+
+    Yields:
+        tuple: (record, None) for each valid line, or (None, error message)
+    """
+    pending = b''
+    for chunk in chunks:
+        pending += chunk
+        lines = pending.split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield _parse_ndjson_line(line)
+    if pending.strip():
+        yield _parse_ndjson_line(pending)
+
+
+def _parse_ndjson_line(line):
+    """Parse one NDJSON line into (record, None) or (None, error)."""
+    try:
+        record = json.loads(line.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError) as e:
+        return None, f'Invalid JSON: {e}'
+    if not isinstance(record, dict):
+        return None, 'Each line must be a JSON object'
+    return record, None
@@ -0,0 +1,177 @@
+"""
+Request Profiler
+Profiles a sample of requests with cProfile and keeps one combined profile
+per route (e.g. "GET /transactions/{id}"). The profiles are written as
+standard .prof files, so they can be opened with:
+
+    python -m pstats profiles/GET_transactions_id.prof
+    snakeviz profiles/GET_transactions_id.prof
+
+Overhead is kept low by sampling, by profiling only one request at a time,
+and by writing files in batches. Each route has a single file that is
+overwritten, and nothing more is written once the disk cap is reached.
+
+On Python 3.12+ cProfile records every thread in the process, which would
+mix other requests into each route's profile, so there we use the
+pure-Python profile module instead. It only sees the request's own thread
+but is several times slower, so profiled requests take longer.
+"""
+
+import cProfile
+import os
+import profile
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+
+
+class ThreadProfile(profile.Profile):
+    """
+    profile.Profile with cProfile-style enable()/disable(), that only
+    records the thread which called enable() (sys.setprofile is per thread).
+    """
+
+    def __init__(self):
+        super().__init__(time.perf_counter)
+
+    def enable(self):
+        sys.setprofile(self.dispatcher)
+
+    def disable(self):
+        sys.setprofile(None)
+
+    def trace_dispatch_return(self, frame, t):
+        # Frames that were already running when enable() was called return
+        # without a matching call event; there is nothing to record for them
+        if self.cur[-1] is None:
+            return 1
+        return super().trace_dispatch_return(frame, t)
+
+    dispatch = dict(profile.Profile.dispatch,
+                    **{'return': trace_dispatch_return, 'c_return': trace_dispatch_return})
+
+
+# cProfile is much faster, but on 3.12+ it can't be limited to one thread
+PER_THREAD_PROFILER = ThreadProfile if sys.version_info >= (3, 12) else cProfile.Profile
+
+
+class RequestProfiler:
+    """Samples requests, aggregates their profiles per route and saves them."""
+
+    def __init__(self, output_dir, sample_rate=0.01, enabled=False,
+                 flush_every=20, max_disk_bytes=50 * 1024 * 1024):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+        self.flush_every = flush_every
+        self.max_disk_bytes = max_disk_bytes
+
+        self._busy = threading.Lock()  # only one request is profiled at a time
+        self._stats = {}               # route -> pstats.Stats
+        self._samples = {}             # route -> number of profiled requests
+        self._unsaved = {}             # route -> samples since the last save
+
+        self.skipped_busy = 0
+        self.skipped_disk_full = 0
+        self.save_errors = 0
+        self.last_error = None
+
+    def start(self, forced=False):
+        """
+        Start profiling the current request if it's picked for sampling.
+
+        Args:
+            forced (bool): Profile regardless of sampling (admin header)
+
+        Returns:
+            cProfile.Profile (or ThreadProfile on 3.12+) or None
+        """
+        if not forced and not (self.enabled and random.random() < self.sample_rate):
+            return None
+        if not self._busy.acquire(blocking=False):
+            self.skipped_busy += 1
+            return None
+
+        request_profile = PER_THREAD_PROFILER()
+        try:
+            request_profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already active
+            self._busy.release()
+            return None
+        return request_profile
+
+    def finish(self, request_profile, route, forced=False):
+        """Stop profiling and add the result to the route's combined profile."""
+        try:
+            request_profile.disable()
+            if route in self._stats:
+                self._stats[route].add(request_profile)
+            else:
+                self._stats[route] = pstats.Stats(request_profile)
+            self._samples[route] = self._samples.get(route, 0) + 1
+            self._unsaved[route] = self._unsaved.get(route, 0) + 1
+
+            if forced or self._unsaved[route] >= self.flush_every:
+                self._save(route)
+        finally:
+            self._busy.release()
+
+    def _file_path(self, route):
+        name = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_')
+        return os.path.join(self.output_dir, f'{name}.prof')
+
+    def _disk_usage(self):
+        try:
+            return sum(entry.stat().st_size for entry in os.scandir(self.output_dir)
+                       if entry.name.endswith('.prof'))
+        except OSError:
+            return 0
+
+    def _save(self, route):
+        """
+        Write the route's combined profile, unless we're over the disk cap.
+        Errors (unwritable directory, full disk) are counted, not raised, so
+        profiling can never fail a request.
+        """
+        path = self._file_path(route)
+        temp_path = path + '.tmp'
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+
+            self._stats[route].dump_stats(temp_path)
+            new_size = os.path.getsize(temp_path)
+
+            if self._disk_usage() - old_size + new_size > self.max_disk_bytes:
+                os.remove(temp_path)
+                self.skipped_disk_full += 1
+                return
+            os.replace(temp_path, path)
+            self._unsaved[route] = 0
+        except OSError as e:
+            self.save_errors += 1
+            self.last_error = str(e)
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def stats(self):
+        """Return sampling settings and per-route sample counts."""
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'output_dir': self.output_dir,
+            'profiler': PER_THREAD_PROFILER.__name__,
+            'routes': dict(self._samples),
+            'disk_bytes': self._disk_usage(),
+            'max_disk_bytes': self.max_disk_bytes,
+            'skipped_busy': self.skipped_busy,
+            'skipped_disk_full': self.skipped_disk_full,
+            'save_errors': self.save_errors,
+            'last_error': self.last_error
+        }
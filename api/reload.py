@@ -0,0 +1,163 @@
+"""
+Live Reload
+Watches the source XML file and, when it changes, re-parses it in a
+background thread and applies only what changed - no restart needed, so
+in-flight requests and data created through the API are kept.
+
+The diff is against the previous version of the file, not against the
+store: a record is only touched if the file changed it. That way edits
+made through the API to other records aren't reverted by a reload.
+"""
+
+import os
+import threading
+import time
+
+from dsa.parser import load_transactions
+
+
+def diff_snapshots(old_records, new_records):
+    """
+    Compare two versions of the file by transaction ID.
+
+    Args:
+        old_records (dict): id -> transaction from the previous load
+        new_records (dict): id -> transaction from the new load
+
+    Returns:
+        tuple: (added, changed, removed) - records new in the file,
+        records the file changed, and IDs the file no longer has
+    """
+    added = [record for tid, record in new_records.items() if tid not in old_records]
+    changed = [record for tid, record in new_records.items()
+               if tid in old_records and old_records[tid] != record]
+    removed = [tid for tid in old_records if tid not in new_records]
+    return added, changed, removed
+
+
+class XMLReloader:
+    """
+    Background thread that polls the XML file for changes.
+
+    A change is only picked up once the file's size and modification time
+    have stayed the same for one poll interval, so we don't read a file
+    that is still being written.
+
+    apply_changes(added, changed, removed) is called with the diff and must
+    apply it atomically. It returns (counts, skipped_ids), where skipped_ids
+    are added records it refused (e.g. the ID is already used by a record
+    created through the API); those are retried on the next reload.
+    """
+
+    def __init__(self, xml_path, apply_changes, poll_seconds=2.0):
+        self.xml_path = xml_path
+        self.apply_changes = apply_changes
+        self.poll_seconds = poll_seconds
+
+        self.snapshot = {}          # id -> transaction, as of the last load
+        self._loaded_signature = None
+        self._pending_signature = None
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload = None     # metrics of the most recent reload
+        self.last_error = None
+
+    def _signature(self):
+        """(mtime, size) of the file, or None if it's missing."""
+        try:
+            stat = os.stat(self.xml_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def mark_loaded(self, transactions):
+        """Remember what the store was loaded from (called after initialize_data)."""
+        self.snapshot = {t['id']: dict(t) for t in transactions}
+        self._loaded_signature = self._signature()
+        self._pending_signature = None
+
+    def start(self):
+        """Start watching in a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name='xml-reloader', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            self.check()
+
+    def check(self):
+        """
+        Reload the file if it changed and has settled.
+
+        Returns:
+            bool: True if a reload was applied
+        """
+        signature = self._signature()
+        if signature is None or signature == self._loaded_signature:
+            self._pending_signature = None
+            return False
+
+        # Wait one more poll to make sure the file isn't still being written
+        if signature != self._pending_signature:
+            self._pending_signature = signature
+            return False
+
+        return self.reload(signature)
+
+    def reload(self, signature=None):
+        """Parse the file, diff it and apply the changes."""
+        if signature is None:
+            signature = self._signature()
+
+        started_at = time.perf_counter()
+        try:
+            new_records = {t['id']: t for t in load_transactions(self.xml_path) if t['id'] is not None}
+        except Exception as e:
+            # Keep serving the old data; try again when the file changes again
+            self.failures += 1
+            self.last_error = str(e)
+            self._loaded_signature = signature
+            print(f"Reload of {self.xml_path} failed: {e}")
+            return False
+        parsed_at = time.perf_counter()
+
+        added, changed, removed = diff_snapshots(self.snapshot, new_records)
+        counts, skipped_ids = self.apply_changes(added, changed, removed)
+        finished_at = time.perf_counter()
+
+        self.snapshot = {tid: dict(record) for tid, record in new_records.items()
+                         if tid not in skipped_ids}
+        self._loaded_signature = signature
+        self._pending_signature = None
+        self.reloads += 1
+        self.last_error = None
+        self.last_reload = {
+            'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'records_in_file': len(new_records),
+            'parse_seconds': round(parsed_at - started_at, 4),
+            'apply_seconds': round(finished_at - parsed_at, 4),
+            'duration_seconds': round(finished_at - started_at, 4),
+            **counts
+        }
+        print(f"Reloaded {self.xml_path}: {counts}")
+        return True
+
+    def stats(self):
+        """Return reload counters and the last reload's metrics."""
+        return {
+            'watching': self._thread is not None and self._thread.is_alive(),
+            'poll_seconds': self.poll_seconds,
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'last_reload': self.last_reload
+        }
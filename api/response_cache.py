@@ -0,0 +1,224 @@
+"""
+Response Cache
+Keeps the encoded JSON of every transaction, so GET responses can be built
+by joining ready-made byte strings instead of running json.dumps over the
+same unchanged records on every request.
+
+The output is byte-for-byte what json.dumps(response, indent=2) would give.
+Run this file directly to benchmark the list endpoint with and without it.
+"""
+
+import json
+
+
+# At most this many encodings (depth + ?fields= projection) are kept per
+# record, so unusual field combinations can't make the cache grow forever
+MAX_VARIANTS_PER_RECORD = 8
+
+# Stands in for the records while the rest of the response is encoded
+RECORDS_PLACEHOLDER = '__momo_records_placeholder__'
+ENCODED_PLACEHOLDER = json.dumps(RECORDS_PLACEHOLDER).encode('utf-8')
+
+
+def project(record, fields):
+    """Return only the requested fields of a record (all of them if fields is None)."""
+    if fields is None:
+        return record
+    return {field: record.get(field) for field in fields}
+
+
+def encode_record(record, depth, fields=None):
+    """
+    Encode one record the way json.dumps(..., indent=2) would if the record
+    sat `depth` levels deep in the response, keeping only `fields`.
+    """
+    text = json.dumps(project(record, fields), indent=2)
+    if depth:
+        text = text.replace('\n', '\n' + '  ' * depth)
+    return text.encode('utf-8')
+
+
+class RecordJSONCache:
+    """
+    Map of transaction ID -> encoded JSON bytes.
+
+    Entries remember which record object they were built from, and PUT
+    swaps in a new object, so a stale entry can never be served even if
+    an invalidate() call were missed.
+
+    is_current(record) tells whether the store still holds that exact
+    record object. It stops a reader working from an older snapshot from
+    re-adding a record after it was deleted, which would never be freed.
+    """
+
+    def __init__(self, enabled=True, is_current=None):
+        self.enabled = enabled
+        self.is_current = is_current
+        self._entries = {}  # id -> (record, {(depth, fields): bytes})
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, record, depth, fields=None):
+        """
+        Return the encoded record for the given depth and projection,
+        encoding it if needed.
+
+        Args:
+            record (dict): The transaction
+            depth (int): How deep the record sits in the response
+            fields (tuple): Fields to keep, or None for the whole record
+        """
+        entry = self._entries.get(record['id'])
+        if entry is None or entry[0] is not record:
+            entry = (record, {})
+            self._entries[record['id']] = entry
+
+            # Check after adding: if the record was changed or deleted before
+            # this point we drop the entry here, otherwise its invalidate()
+            # comes after our add and drops it
+            if self.is_current is not None and not self.is_current(record):
+                self._entries.pop(record['id'], None)
+
+        variants = entry[1]
+        fragment = variants.get((depth, fields))
+        if fragment is None:
+            self.misses += 1
+            fragment = encode_record(record, depth, fields)
+            if len(variants) < MAX_VARIANTS_PER_RECORD:
+                variants[(depth, fields)] = fragment
+        else:
+            self.hits += 1
+        return fragment
+
+    def invalidate(self, transaction_id):
+        """Forget the encoded JSON for a changed or deleted transaction."""
+        if self._entries.pop(transaction_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        """Forget everything (e.g. after the whole store is reloaded)."""
+        self._entries = {}
+
+    def encode_response(self, envelope, records, fields=None):
+        """
+        Encode a response whose 'data' is a list of records or one record.
+
+        Args:
+            envelope (dict): Response with 'data' set to RECORDS_PLACEHOLDER
+            records (list or dict): Records to splice in as 'data'
+            fields (tuple): Fields to keep in each record, or None for all
+
+        Returns:
+            bytes: Same as json.dumps(response, indent=2).encode('utf-8')
+        """
+        head, tail = json.dumps(envelope, indent=2).encode('utf-8').split(ENCODED_PLACEHOLDER)
+
+        if isinstance(records, dict):
+            body = self.get(records, 1, fields)
+        elif records:
+            body = b'[\n    ' + b',\n    '.join(self.get(r, 2, fields) for r in records) + b'\n  ]'
+        else:
+            body = b'[]'
+
+        return head + body + tail
+
+    def stats(self):
+        """Return hit/miss counters as a dict."""
+        return {
+            'enabled': self.enabled,
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations
+        }
+
+
+def run_benchmark(num_records=5000, seconds=3.0):
+    """
+    Compare the list endpoint with the cache on and off:
+    raw encode time, then requests/sec against a real server.
+    """
+    import base64
+    import http.client
+    import os
+    import sys
+    import threading
+    import time
+    from http.server import ThreadingHTTPServer
+
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from api import server
+
+    # Build a synthetic store so the numbers don't depend on the XML file
+    server.transaction_store = server.ShardedStore(server.STORE_SHARDS)
+    server.add_transactions([{
+        'type': 'Send Money',
+        'amount': 1000 + i,
+        'sender': f'25078{i:07d}',
+        'receiver': '250780000002',
+        'timestamp': '2026-01-15T10:30:00',
+        'status': 'completed'
+    } for i in range(num_records)])
+    server.data_ready.set()
+    server.admission_controller.rate_per_second = 0
+
+    records = server.transaction_store.snapshot()
+    envelope = {'success': True, 'count': len(records), 'data': RECORDS_PLACEHOLDER}
+    full = {'success': True, 'count': len(records), 'data': records}
+
+    print("=" * 60)
+    print("RESPONSE CACHE BENCHMARK")
+    print("=" * 60)
+    print(f"Records: {num_records}")
+
+    # 1. Encode time only
+    iterations = 20
+    start = time.perf_counter()
+    for _ in range(iterations):
+        json.dumps(full, indent=2).encode('utf-8')
+    plain = (time.perf_counter() - start) / iterations
+
+    cache = RecordJSONCache()
+    cache.encode_response(envelope, records)  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        cache.encode_response(envelope, records)
+    cached = (time.perf_counter() - start) / iterations
+
+    assert cache.encode_response(envelope, records) == json.dumps(full, indent=2).encode('utf-8')
+
+    print(f"\nEncode time, cache off: {plain * 1000:.2f} ms")
+    print(f"Encode time, cache on:  {cached * 1000:.2f} ms  ({plain / cached:.1f}x faster)")
+
+    # 2. Requests per second against the real handler
+    server.TransactionAPIHandler.log_message = lambda *args: None
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), server.TransactionAPIHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    auth = {'Authorization': 'Basic ' + base64.b64encode(b'admin:password').decode('utf-8')}
+
+    def requests_per_second():
+        count = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            conn.request('GET', '/transactions', headers=auth)
+            conn.getresponse().read()
+            conn.close()
+            count += 1
+        return count / seconds
+
+    print()
+    for enabled in (False, True):
+        server.response_cache.enabled = enabled
+        rps = requests_per_second()
+        print(f"GET /transactions, cache {'on ' if enabled else 'off'}: {rps:.1f} requests/sec")
+
+    httpd.shutdown()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
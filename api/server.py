@@ -4,43 +4,350 @@ This is our REST API for managing mobile money transactions.
 We're using plain Python's http.server module (no Flask or Django).
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import hashlib
+import itertools
 import json
+import math
 import sys
 import os
+import threading
+import time
 from urllib.parse import urlparse, parse_qs
 
 # Add parent directory to path to import other modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dsa.parser import parse_xml_to_json, create_transaction_dictionary
-from api.auth import authenticate_request, get_auth_error_response
+from dsa.parser import load_transactions
+from dsa.sharded_store import ShardedStore, build_sharded_store
+from api.auth import authenticate_request, get_authenticated_user, get_auth_error_response
+from api.idempotency import IdempotencyCache
+from api.admission import AdmissionController
+from api.export import TRANSACTION_FIELDS, EXPORT_CONTENT_TYPES, parse_field_list, iter_export
+from api.ingest import iter_request_body, iter_xml_records, iter_ndjson_records
+from api.response_cache import RecordJSONCache, RECORDS_PLACEHOLDER, project
+from api.changes import ChangeLog
+from api.reload import XMLReloader
+from api.profiler import RequestProfiler
 
 
 # Store transactions in memory (resets when server restarts)
 # TODO: Maybe add database later?
-transactions_list = []  # list of all transactions
-transactions_dict = {}  # for faster lookup by ID
-next_id = 1
+# The server handles each request in its own thread, so the store is split
+# into shards by ID, each with its own lock, records and indexes (prefix
+# tries and amount index). A write only locks the shard it touches.
+STORE_SHARDS = 16
+transaction_store = ShardedStore(STORE_SHARDS)
 
+# Where the transactions are loaded from
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'data', 'modified_sms_v2.xml')
 
-def initialize_data():
-    """Load transactions from the XML file"""
-    global transactions_list, transactions_dict, next_id
+# Query parameters that narrow down GET /transactions
+FILTER_PARAMS = ('sender_prefix', 'receiver_prefix', 'min_amount', 'max_amount', 'limit')
+
+# A list request is only cheap (not "heavy" for admission control) with a
+# prefix of at least MIN_CHEAP_PREFIX characters, or with a limit of at most
+# MAX_CHEAP_LIMIT plus a prefix filter or sort=amount. Shorter prefixes like
+# "2507" (all mobile numbers) or "25078" (a whole operator) match most of the store.
+MIN_CHEAP_PREFIX = 8
+MAX_CHEAP_LIMIT = 1000
+
+# Remembers POST responses by Idempotency-Key so client retries don't
+# create duplicate transactions
+IDEMPOTENCY_MAX_KEYS = 10000
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+idempotency_cache = IdempotencyCache(IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_TTL_SECONDS)
+
+# Admission control: fast 503/429 instead of piling up requests under load.
+# Full-list scans count as "heavy" and can only use part of the slots,
+# so lookups by ID still get through while big scans are running.
+MAX_IN_FLIGHT = 64
+MAX_HEAVY_IN_FLIGHT = 8
+RATE_LIMIT_PER_SECOND = 50  # per user, set to 0 to turn off
+RATE_LIMIT_BURST = 100
+MAX_LONG_POLLS = 100  # change feed waits, kept apart from MAX_IN_FLIGHT
+admission_controller = AdmissionController(MAX_IN_FLIGHT, MAX_HEAVY_IN_FLIGHT,
+                                           RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST,
+                                           MAX_LONG_POLLS)
+
+# Bulk import (POST /transactions/import)
+REQUIRED_FIELDS = ['type', 'amount', 'sender', 'receiver']
+IMPORT_BATCH_SIZE = 500  # records inserted per lock acquisition (per shard)
+IMPORT_MAX_ERRORS = 100  # rejected records listed in the summary
+IMPORT_FORMATS = {
+    'application/xml': iter_xml_records,
+    'text/xml': iter_xml_records,
+    'application/x-ndjson': iter_ndjson_records,
+    'application/ndjson': iter_ndjson_records
+}
+import_ids = itertools.count(1)
+active_imports = {}  # import id -> progress dict, shown in GET /stats
+last_import = None   # summary of the most recent finished import
+
+# Encoded JSON of each record, reused by GET responses until PUT/DELETE
+RESPONSE_CACHE_ENABLED = True
+response_cache = RecordJSONCache(RESPONSE_CACHE_ENABLED,
+                                 lambda record: transaction_store.get(record['id']) is record)
+
+# Every create/update/delete, for GET /transactions/changes?since=N
+CHANGE_LOG_SIZE = 10000
+CHANGES_MAX_WAIT_SECONDS = 30  # longest a long-poll may wait
+CHANGES_MAX_LIMIT = 1000
+change_log = ChangeLog(CHANGE_LOG_SIZE)
+
+
+def apply_reload(added, changed, removed):
+    """
+    Apply the changes found in a new version of the XML file, holding every
+    shard lock so readers see either the old data or the new data.
     
-    # figure out where the XML file is
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    xml_path = os.path.join(os.path.dirname(current_dir), 'data', 'modified_sms_v2.xml')
+    Records that were deleted through the API stay deleted, and an added
+    record is skipped if its ID is already used by a record created
+    through the API.
     
-    # Parse XML data
-    transactions_list = parse_xml_to_json(xml_path)
-    transactions_dict = create_transaction_dictionary(transactions_list)
+    Returns:
+        tuple: (counts dict, set of skipped IDs)
+    """
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'conflicts': 0}
+    skipped_ids = set()
+    store = transaction_store
     
-    # Set next_id to one more than the highest existing ID
-    if transactions_list:
-        next_id = max(t['id'] for t in transactions_list) + 1
+    with store.locked_all():
+        # Updates: swap in the new version of each changed record
+        for record in changed:
+            shard = store.shard_for(record['id'])
+            if record['id'] not in shard.records:
+                continue
+            updated = dict(record)
+            shard.replace(updated)
+            response_cache.invalidate(record['id'])
+            change_log.record('update', record['id'], updated)
+            counts['updated'] += 1
+        
+        # Deletes
+        for transaction_id in removed:
+            existing = store.shard_for(transaction_id).remove(transaction_id)
+            if existing is None:
+                continue
+            response_cache.invalidate(transaction_id)
+            change_log.record('delete', transaction_id, existing)
+            counts['deleted'] += 1
+        
+        # Inserts
+        for record in added:
+            shard = store.shard_for(record['id'])
+            if record['id'] in shard.records:
+                skipped_ids.add(record['id'])
+                continue
+            new_transaction = dict(record)
+            shard.add(new_transaction)
+            change_log.record('create', new_transaction['id'], new_transaction)
+            counts['inserted'] += 1
+        counts['conflicts'] = len(skipped_ids)
+        
+        # New IDs must come after anything the file added
+        if counts['inserted']:
+            store.reserve_ids(max(record['id'] for record in added if record['id'] not in skipped_ids))
     
-    print(f"Initialized with {len(transactions_list)} transactions")
+    return counts, skipped_ids
+
+
+# Watches DATA_FILE and applies changes without a restart
+RELOAD_ENABLED = True
+RELOAD_POLL_SECONDS = 2.0
+reloader = XMLReloader(DATA_FILE, apply_reload, RELOAD_POLL_SECONDS)
+
+# Sampling profiler: profiles PROFILE_SAMPLE_RATE of requests when enabled.
+# Admins can also profile a single request by sending "X-Profile: 1".
+PROFILING_ENABLED = False
+PROFILE_SAMPLE_RATE = 0.01
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'profiles')
+PROFILE_MAX_DISK_BYTES = 50 * 1024 * 1024
+PROFILE_ADMIN_USERS = {'admin'}
+request_profiler = RequestProfiler(PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILING_ENABLED,
+                                   max_disk_bytes=PROFILE_MAX_DISK_BYTES)
+
+# Startup: the server answers right away and loads the data in the
+# background. Data endpoints return 503 until data_ready is set.
+data_ready = threading.Event()
+load_progress = {
+    'state': 'loading',
+    'bytes_read': 0,
+    'total_bytes': 0,
+    'records_loaded': 0,
+    'started_at': None,
+    'finished_at': None,
+    'duration_seconds': None,
+    'error': None
+}
+
+
+def update_load_progress(bytes_read, total_bytes, records_loaded):
+    """Progress callback for the XML parser, shown in GET /readyz."""
+    load_progress['bytes_read'] = bytes_read
+    load_progress['total_bytes'] = total_bytes
+    load_progress['records_loaded'] = records_loaded
+
+
+def initialize_data(progress_callback=None):
+    """
+    Load transactions from the XML file.
+    
+    Raises:
+        OSError, ET.ParseError: If the file is missing or malformed, so
+            the server stays not-ready instead of serving an empty store
+    """
+    global transaction_store
+    
+    load_progress['started_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    started_at = time.perf_counter()
+    
+    # Parse and index into a new store, then swap it in at once.
+    # New IDs start at one more than the highest existing ID.
+    loaded_list = load_transactions(DATA_FILE, progress_callback)
+    transaction_store = build_sharded_store(loaded_list, STORE_SHARDS)
+    response_cache.clear()
+    
+    # Later reloads are diffed against what we loaded now
+    reloader.mark_loaded(loaded_list)
+    
+    load_progress['state'] = 'ready'
+    load_progress['records_loaded'] = len(loaded_list)
+    load_progress['finished_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    load_progress['duration_seconds'] = round(time.perf_counter() - started_at, 3)
+    data_ready.set()
+    print(f"Initialized with {len(loaded_list)} transactions")
+
+
+def load_data_in_background():
+    """Load the data while the server is already answering, then start the reloader."""
+    try:
+        initialize_data(update_load_progress)
+    except Exception as e:
+        # Stay not-ready so a load balancer keeps traffic away
+        load_progress['state'] = 'failed'
+        load_progress['error'] = str(e)
+        print(f"Loading {DATA_FILE} failed: {e}")
+        return
+    
+    # Pick up changes to the XML file without restarting
+    if RELOAD_ENABLED:
+        reloader.start()
+
+
+def parse_amount(value):
+    """
+    Convert a request amount to a float.
+    
+    Raises:
+        ValueError: If it isn't a number, or is NaN or infinite (those
+            can't be ordered, so they'd break the amount index)
+    """
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid amount: {value!r}')
+    if not math.isfinite(amount):
+        raise ValueError(f'Invalid amount: {value!r}')
+    return amount
+
+
+def build_transaction(transaction_id, transaction_data):
+    """Create a transaction dict from validated request data."""
+    return {
+        'id': transaction_id,
+        'type': transaction_data['type'],
+        'amount': parse_amount(transaction_data['amount']),
+        'sender': transaction_data['sender'],
+        'receiver': transaction_data['receiver'],
+        'timestamp': transaction_data.get('timestamp', ''),
+        'status': transaction_data.get('status', 'pending')
+    }
+
+
+def add_transactions(batch):
+    """
+    Add transactions from validated request data to the store.
+    
+    IDs are allocated without locking, then the records are grouped by
+    shard so each shard's lock is taken once for the whole batch.
+    
+    Args:
+        batch (list): Dicts containing at least REQUIRED_FIELDS
+        
+    Returns:
+        list: The stored transactions
+    """
+    store = transaction_store
+    stored = []
+    pending = batch
+    while pending:
+        by_shard = {}
+        for transaction_data in pending:
+            transaction_id = store.allocate_id()
+            by_shard.setdefault(store.shard_for(transaction_id), []).append((transaction_id, transaction_data))
+        
+        retry = []
+        for shard, items in by_shard.items():
+            with shard.lock:
+                for transaction_id, transaction_data in items:
+                    # A record loaded from the file may already use this ID
+                    if transaction_id in shard.records:
+                        retry.append(transaction_data)
+                        continue
+                    new_transaction = build_transaction(transaction_id, transaction_data)
+                    shard.add(new_transaction)
+                    change_log.record('create', transaction_id, new_transaction)
+                    stored.append(new_transaction)
+        pending = retry
+    
+    return stored
+
+
+def add_transaction(transaction_data):
+    """
+    Create a transaction from validated request data and add it to the store.
+    
+    Args:
+        transaction_data (dict): Data containing at least REQUIRED_FIELDS
+        
+    Returns:
+        dict: The stored transaction
+    """
+    return add_transactions([transaction_data])[0]
+
+
+def is_cheap_search(query):
+    """
+    True if GET /transactions with this query reads only a small part of
+    the store: a long prefix, or a prefix or top-K by amount with a small
+    limit. An amount range, a short prefix or a big limit can still match
+    everything.
+    """
+    prefixes = [query[param] for param in ('sender_prefix', 'receiver_prefix') if param in query]
+    if any(len(prefix) >= MIN_CHEAP_PREFIX for prefix in prefixes):
+        return True
+    
+    if prefixes or query.get('sort') == 'amount':
+        try:
+            return int(query.get('limit', '')) <= MAX_CHEAP_LIMIT
+        except ValueError:
+            return False
+    return False
+
+
+def search_transactions(sender_prefix=None, receiver_prefix=None, min_amount=None,
+                        max_amount=None, sort=None, descending=False, limit=None):
+    """
+    Combine prefix, amount range, sorting and limit for GET /transactions.
+    Each shard is searched with its indexes and the results are merged.
+    
+    Returns:
+        list: Matching transactions - by amount if sort='amount', otherwise by ID
+    """
+    return transaction_store.search(sender_prefix, receiver_prefix, min_amount,
+                                    max_amount, sort, descending, limit)
 
 
 class TransactionAPIHandler(BaseHTTPRequestHandler):
@@ -49,13 +356,20 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
     Implements CRUD operations with authentication
     """
     
-    def _set_headers(self, status_code=200, content_type='application/json'):
+    # HTTP/1.1 so the export endpoint can use chunked encoding.
+    # Normal responses still close the connection like HTTP/1.0 did.
+    protocol_version = 'HTTP/1.1'
+    
+    def _set_headers(self, status_code=200, content_type='application/json', extra_headers=None):
         """Set HTTP response headers."""
         self.send_response(status_code)
         self.send_header('Content-Type', content_type)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization, Idempotency-Key, X-Profile')
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Connection', 'close')
         self.end_headers()
     
     def _authenticate(self):
@@ -66,19 +380,132 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         auth_header = self.headers.get('Authorization')
         return authenticate_request(auth_header)
     
-    def _send_json_response(self, data, status_code=200):
+    def _check_ready(self):
+        """
+        Return True if the data has finished loading.
+        Otherwise a 503 with Retry-After is sent and False is returned.
+        """
+        if data_ready.is_set():
+            return True
+        self._send_json_response(self._error_data('Data is still loading, please try again shortly', 503),
+                                 503, extra_headers={'Retry-After': '1'})
+        return False
+    
+    def _send_readiness(self):
+        """GET /readyz - 200 once the data is loaded, 503 with progress until then."""
+        progress = dict(load_progress)
+        if progress['total_bytes']:
+            progress['percent'] = round(100 * progress['bytes_read'] / progress['total_bytes'], 1)
+        
+        if data_ready.is_set():
+            self._send_json_response({'ready': True, 'data': progress})
+        else:
+            self._send_json_response({'ready': False, 'data': progress}, 503,
+                                     extra_headers={'Retry-After': '1'})
+    
+    def _admit(self, heavy=False, long_poll=False):
+        """
+        Ask the admission controller for a slot for this request.
+        If we're overloaded (503) or the user is over their rate limit (429),
+        the rejection is sent here and False is returned.
+        """
+        username = get_authenticated_user(self.headers.get('Authorization'))
+        rejection = admission_controller.acquire(username, heavy, long_poll)
+        
+        if rejection:
+            status_code, retry_after = rejection
+            if status_code == 429:
+                message = 'Rate limit exceeded, please slow down'
+            else:
+                message = 'Server is busy, please try again shortly'
+            self._send_json_response(self._error_data(message, status_code), status_code,
+                                     extra_headers={'Retry-After': str(retry_after)})
+            return False
+        
+        self._admitted = (heavy, long_poll)
+        
+        # Maybe profile the rest of this request
+        self._profile_forced = self.headers.get('X-Profile') == '1' and username in PROFILE_ADMIN_USERS
+        self._profile = request_profiler.start(self._profile_forced)
+        return True
+    
+    def _route_name(self):
+        """
+        Name the route for profiling, e.g. 'GET /transactions/{id}'.
+        Unknown paths are grouped together so the number of routes stays small.
+        """
+        endpoint, transaction_id = self._parse_path()
+        if endpoint not in ('transactions', 'stats'):
+            return f'{self.command} /other'
+        
+        route = f'{self.command} /{endpoint}'
+        subresource = self._parse_subresource()
+        if transaction_id is not None:
+            route += '/{id}'
+        elif subresource:
+            route += '/' + (subresource if subresource in ('export', 'changes', 'import') else 'other')
+        return route
+    
+    def handle_one_request(self):
+        """
+        Handle one request, then give back its admission slot (if it got one)
+        and save its profile (if it was sampled).
+        """
+        self._admitted = None
+        self._profile = None
+        try:
+            try:
+                super().handle_one_request()
+            finally:
+                if self._profile is not None:
+                    profile, self._profile = self._profile, None
+                    request_profiler.finish(profile, self._route_name(), self._profile_forced)
+        finally:
+            # Always give the slot back, even if saving the profile failed
+            if self._admitted is not None:
+                admission_controller.release(*self._admitted)
+                self._admitted = None
+    
+    def _send_json_response(self, data, status_code=200, extra_headers=None):
         """Send JSON response."""
-        self._set_headers(status_code)
-        self.wfile.write(json.dumps(data, indent=2).encode('utf-8'))
+        self._send_json_bytes(json.dumps(data, indent=2).encode('utf-8'), status_code, extra_headers)
     
-    def _send_error_response(self, message, status_code=400):
-        """Send error response."""
-        error_data = {
+    def _send_json_bytes(self, body, status_code=200, extra_headers=None):
+        """Send an already-encoded JSON body."""
+        headers = {'Content-Length': str(len(body))}
+        headers.update(extra_headers or {})
+        self._set_headers(status_code, extra_headers=headers)
+        self.wfile.write(body)
+    
+    def _send_records_response(self, envelope, records, fields=None, status_code=200):
+        """
+        Send a response whose 'data' is a list of records (or one record).
+        Each record's JSON comes from response_cache, so unchanged records
+        aren't re-encoded on every request. If fields is given, only those
+        fields are encoded (and cached per projection).
+        """
+        if not response_cache.enabled:
+            if isinstance(records, dict):
+                data = project(records, fields)
+            else:
+                data = [project(record, fields) for record in records]
+            self._send_json_response(dict(envelope, data=data), status_code)
+            return
+        
+        envelope = dict(envelope, data=RECORDS_PLACEHOLDER)
+        self._send_json_bytes(response_cache.encode_response(envelope, records, fields), status_code)
+    
+    def _error_data(self, message, status_code=400):
+        """Build the standard error body."""
+        return {
             'error': True,
             'message': message,
             'status': status_code
         }
-        self._send_json_response(error_data, status_code)
+    
+    def _send_error_response(self, message, status_code=400):
+        """Send error response."""
+        self._send_json_response(self._error_data(message, status_code), status_code)
     
     def _get_request_body(self):
         """Read and parse JSON request body."""
@@ -105,6 +532,161 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         
         return endpoint, transaction_id
     
+    def _parse_subresource(self):
+        """
+        Get a named sub-resource like 'export' in /transactions/export.
+        Returns None for /transactions and /transactions/{id}.
+        """
+        path_parts = urlparse(self.path).path.strip('/').split('/')
+        if len(path_parts) > 1 and not path_parts[1].isdigit():
+            return path_parts[1]
+        return None
+    
+    def _parse_fields(self, query):
+        """
+        Parse ?fields=id,amount,status from the query.
+        
+        Returns:
+            tuple: (fields, error). fields is None when every field is wanted,
+            error is a message if an unknown field was requested.
+        """
+        try:
+            fields = parse_field_list(query.get('fields'))
+        except ValueError as e:
+            return None, str(e)
+        
+        if fields == TRANSACTION_FIELDS:
+            return None, None
+        return tuple(fields), None
+    
+    def _parse_search(self, query):
+        """
+        Parse the filter, sort and limit parameters of GET /transactions.
+        
+        Returns:
+            tuple: (keyword arguments for search_transactions, error message)
+        """
+        try:
+            min_amount = float(query['min_amount']) if 'min_amount' in query else None
+            max_amount = float(query['max_amount']) if 'max_amount' in query else None
+            limit = int(query['limit']) if 'limit' in query else None
+        except ValueError:
+            return None, 'min_amount and max_amount must be numbers and limit must be an integer'
+        
+        if any(amount is not None and math.isnan(amount) for amount in (min_amount, max_amount)):
+            return None, 'min_amount and max_amount must be numbers and limit must be an integer'
+        
+        if limit is not None and limit < 1:
+            return None, 'limit must be at least 1'
+        
+        sort = query.get('sort')
+        if sort is not None and sort != 'amount':
+            return None, "Unsupported sort field, only 'amount' is supported"
+        
+        order = query.get('order', 'asc')
+        if order not in ('asc', 'desc'):
+            return None, "order must be 'asc' or 'desc'"
+        if 'order' in query and sort is None:
+            return None, 'order requires sort=amount'
+        
+        return {
+            'sender_prefix': query.get('sender_prefix'),
+            'receiver_prefix': query.get('receiver_prefix'),
+            'min_amount': min_amount,
+            'max_amount': max_amount,
+            'sort': sort,
+            'descending': order == 'desc',
+            'limit': limit
+        }, None
+    
+    def _parse_query(self):
+        """
+        Parse the query string into a simple dict.
+        Only the first value of each parameter is kept.
+        """
+        query = parse_qs(urlparse(self.path).query)
+        return {key: values[0] for key, values in query.items()}
+    
+    def _send_export(self, query):
+        """
+        Stream every transaction as NDJSON or CSV.
+        
+        Rows come from a snapshot of the store taken under the shard locks.
+        PUT replaces records instead of editing them in place, so the
+        snapshot is a consistent point-in-time view even while writes continue.
+        Taking it costs one list of references per shard (O(n) pointers, no
+        record copies); the shards are then merged lazily by ID, and the body
+        is generated row by row and sent with chunked encoding.
+        """
+        export_format = query.get('format', 'ndjson')
+        if export_format not in EXPORT_CONTENT_TYPES:
+            self._send_error_response(f"Unsupported format '{export_format}', use ndjson or csv", 400)
+            return
+        
+        try:
+            fields = parse_field_list(query.get('fields'))
+        except ValueError as e:
+            self._send_error_response(str(e), 400)
+            return
+        
+        snapshot = transaction_store.iter_snapshot()
+        
+        # HTTP/1.0 clients don't understand chunked, so just stream and close
+        chunked = self.request_version != 'HTTP/1.0'
+        self._set_headers(200, EXPORT_CONTENT_TYPES[export_format],
+                          extra_headers={'Transfer-Encoding': 'chunked'} if chunked else None)
+        
+        for chunk in iter_export(snapshot, fields, export_format):
+            if chunked:
+                self.wfile.write(b'%X\r\n%s\r\n' % (len(chunk), chunk))
+            else:
+                self.wfile.write(chunk)
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
+    
+    def _send_changes(self, query):
+        """
+        Send the changes made after sequence number `since`.
+        
+        With ?timeout=S the request waits up to S seconds for a change if
+        there are none yet (long-polling). If the changes the client needs
+        were already dropped from the log, it gets 410 and must resync by
+        fetching the full list again.
+        """
+        try:
+            since = int(query.get('since', 0))
+            timeout = min(float(query.get('timeout', 0)), CHANGES_MAX_WAIT_SECONDS)
+            limit = min(int(query.get('limit', CHANGES_MAX_LIMIT)), CHANGES_MAX_LIMIT)
+        except ValueError:
+            self._send_error_response('since, timeout and limit must be numbers', 400)
+            return
+        
+        if since < 0 or limit < 1:
+            self._send_error_response('since must be >= 0 and limit must be >= 1', 400)
+            return
+        
+        changes, latest_seq = change_log.since(since, limit, max(timeout, 0))
+        
+        if changes is None:
+            self._send_json_response({
+                'error': True,
+                'message': 'Resync required: changes after this sequence number are no longer available. '
+                           'Fetch GET /transactions and follow on from latest_seq.',
+                'status': 410,
+                'resync_required': True,
+                'latest_seq': latest_seq
+            }, 410)
+            return
+        
+        self._send_json_response({
+            'success': True,
+            'since': since,
+            'latest_seq': latest_seq,
+            'next_since': changes[-1]['seq'] if changes else since,
+            'count': len(changes),
+            'changes': changes
+        })
+    
     # ============================================================
     # GET ENDPOINTS (Author: Chely Kelvin Sheja)
     # ============================================================
@@ -114,35 +696,111 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         Handle GET requests.
         GET /transactions -> List all transactions
         GET /transactions/{id} -> Get specific transaction
+        GET /transactions?sender_prefix=25078 -> Search by phone prefix
+        GET /transactions?min_amount=500000 -> Filter by amount range
+        GET /transactions?sort=amount&order=desc&limit=100 -> Top 100 by amount
+        GET /transactions/export?format=ndjson|csv -> Stream all transactions
+        GET /transactions/changes?since=N -> Changes after sequence N
+        Add ?fields=id,amount,status to any of these to get only those fields.
+        GET /healthz -> Liveness probe, no authentication
+        GET /readyz -> Readiness probe with load progress, no authentication
         """
+        endpoint, transaction_id = self._parse_path()
+        
+        # Probes skip authentication and admission so they always answer
+        if endpoint == 'healthz' and transaction_id is None:
+            self._send_json_response({'status': 'ok'})
+            return
+        if endpoint == 'readyz' and transaction_id is None:
+            self._send_readiness()
+            return
+        
         # Check authentication
         if not self._authenticate():
             self._send_json_response(get_auth_error_response(), 401)
             return
         
-        endpoint, transaction_id = self._parse_path()
+        if endpoint != 'stats' and not self._check_ready():
+            return
+        
+        query = self._parse_query()
+        
+        subresource = self._parse_subresource()
+        
+        # Full-list scans and exports are heavy, lookups by ID and narrow searches are cheap
+        is_full_scan = (endpoint == 'transactions' and transaction_id is None
+                        and (subresource == 'export'
+                             or (subresource is None and not is_cheap_search(query))))
+        # Change feed requests that wait for changes use the long-poll slots
+        try:
+            is_long_poll = subresource == 'changes' and float(query.get('timeout', 0)) > 0
+        except ValueError:
+            is_long_poll = False
+        
+        if not self._admit(heavy=is_full_scan, long_poll=is_long_poll):
+            return
+        
+        # GET /stats - Cache and load counters
+        if endpoint == 'stats':
+            self._send_json_response({
+                'success': True,
+                'data': {
+                    'store': transaction_store.stats(),
+                    'idempotency': idempotency_cache.stats(),
+                    'admission': admission_controller.stats(),
+                    'response_cache': response_cache.stats(),
+                    'change_log': change_log.stats(),
+                    'reload': reloader.stats(),
+                    'profiler': request_profiler.stats(),
+                    'imports': {
+                        'active': [dict(p) for p in list(active_imports.values())],
+                        'last': last_import
+                    }
+                }
+            })
+            return
         
         if endpoint != 'transactions':
             self._send_error_response('Invalid endpoint', 404)
             return
         
+        # GET /transactions/export - Streaming export
+        if subresource == 'export':
+            self._send_export(query)
+            return
+        
+        # GET /transactions/changes?since=N - Change feed
+        if subresource == 'changes':
+            self._send_changes(query)
+            return
+        
+        fields, error = self._parse_fields(query)
+        if error:
+            self._send_error_response(error, 400)
+            return
+        
         # GET /transactions/{id} - Get single transaction
         if transaction_id is not None:
-            if transaction_id in transactions_dict:
-                self._send_json_response({
-                    'success': True,
-                    'data': transactions_dict[transaction_id]
-                })
+            transaction = transaction_store.get(transaction_id)
+            if transaction is not None:
+                self._send_records_response({'success': True}, transaction, fields)
             else:
                 self._send_error_response(f'Transaction with ID {transaction_id} not found', 404)
         
-        # GET /transactions - List all transactions
+        # GET /transactions?sender_prefix=...&min_amount=...&sort=amount... - Search
         else:
-            self._send_json_response({
-                'success': True,
-                'count': len(transactions_list),
-                'data': transactions_list
-            })
+            if any(param in query for param in FILTER_PARAMS + ('sort', 'order')):
+                search, error = self._parse_search(query)
+                if error:
+                    self._send_error_response(error, 400)
+                    return
+                results = search_transactions(**search)
+                self._send_records_response({'success': True, 'count': len(results)}, results, fields)
+                return
+            
+            # GET /transactions - List all transactions
+            snapshot = transaction_store.snapshot()
+            self._send_records_response({'success': True, 'count': len(snapshot)}, snapshot, fields)
     
     # ============================================================
     # POST ENDPOINT (Author: Chely Kelvin Sheja)
@@ -152,56 +810,206 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
         """
         Handle POST requests.
         POST /transactions -> Create new transaction
-        """
-        global next_id
+        POST /transactions/import -> Bulk import XML or NDJSON
         
+        If the client sends an Idempotency-Key header, the response is
+        remembered and a retry with the same key gets the same response
+        back instead of creating a second transaction.
+        """
         # Check authentication
         if not self._authenticate():
             self._send_json_response(get_auth_error_response(), 401)
             return
         
+        if not self._check_ready():
+            return
+        
         endpoint, _ = self._parse_path()
+        subresource = self._parse_subresource()
+        
+        # Imports run for a long time, so they count as heavy
+        if not self._admit(heavy=subresource == 'import'):
+            return
         
         if endpoint != 'transactions':
             self._send_error_response('Invalid endpoint', 404)
             return
         
+        # POST /transactions/import - Bulk import
+        if subresource == 'import':
+            self._import_transactions()
+            return
+        
         # Parse request body
         new_transaction_data = self._get_request_body()
         
-        if not new_transaction_data:
-            self._send_error_response('Invalid JSON in request body', 400)
+        idempotency_key = self.headers.get('Idempotency-Key')
+        if not idempotency_key:
+            response, status_code = self._create_transaction(new_transaction_data)
+            self._send_json_response(response, status_code)
+            return
+        
+        # Keys are scoped per user so two clients can't see each other's responses
+        username = get_authenticated_user(self.headers.get('Authorization'))
+        cache_key = f"{username}:{idempotency_key}"
+        fingerprint = hashlib.sha256(
+            json.dumps(new_transaction_data, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        
+        entry, is_owner = idempotency_cache.begin(cache_key, fingerprint)
+        
+        if not is_owner:
+            if entry.fingerprint != fingerprint:
+                self._send_error_response('Idempotency-Key was already used with a different request body', 422)
+            elif idempotency_cache.wait(entry):
+                self._send_json_response(entry.response, entry.status_code,
+                                         extra_headers={'Idempotent-Replayed': 'true'})
+            else:
+                self._send_error_response('A request with this Idempotency-Key is still in progress', 409)
             return
         
+        try:
+            response, status_code = self._create_transaction(new_transaction_data)
+        except Exception:
+            idempotency_cache.abandon(cache_key, entry)
+            raise
+        
+        idempotency_cache.complete(cache_key, entry, status_code, response)
+        self._send_json_response(response, status_code)
+    
+    def _create_transaction(self, new_transaction_data):
+        """
+        Validate the body and add a new transaction to the store.
+        
+        Returns:
+            tuple: (response_data, status_code)
+        """
+        if not new_transaction_data:
+            return self._error_data('Invalid JSON in request body', 400), 400
+        
         # Validate required fields
-        required_fields = ['type', 'amount', 'sender', 'receiver']
-        missing_fields = [field for field in required_fields if field not in new_transaction_data]
+        missing_fields = [field for field in REQUIRED_FIELDS if field not in new_transaction_data]
         
         if missing_fields:
-            self._send_error_response(f'Missing required fields: {", ".join(missing_fields)}', 400)
-            return
-        
-        # Create new transaction
-        new_transaction = {
-            'id': next_id,
-            'type': new_transaction_data['type'],
-            'amount': float(new_transaction_data['amount']),
-            'sender': new_transaction_data['sender'],
-            'receiver': new_transaction_data['receiver'],
-            'timestamp': new_transaction_data.get('timestamp', ''),
-            'status': new_transaction_data.get('status', 'pending')
+            return self._error_data(f'Missing required fields: {", ".join(missing_fields)}', 400), 400
+        
+        try:
+            new_transaction_data['amount'] = parse_amount(new_transaction_data['amount'])
+        except ValueError as e:
+            return self._error_data(str(e), 400), 400
+        
+        new_transaction = add_transaction(new_transaction_data)
+        
+        # Return a copy so later PUTs don't change a remembered response
+        return {
+            'success': True,
+            'message': 'Transaction created successfully',
+            'data': dict(new_transaction)
+        }, 201
+    
+    def _import_transactions(self):
+        """
+        Stream an uploaded XML or NDJSON file into the store.
+        
+        The body is parsed as it comes off the socket and valid records are
+        inserted in batches of IMPORT_BATCH_SIZE, so memory use doesn't grow
+        with the upload. Progress is shown in GET /stats while it runs, and
+        the response summarises accepted and rejected records.
+        """
+        global last_import
+        
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        parse_records = IMPORT_FORMATS.get(content_type)
+        if parse_records is None:
+            self._send_error_response(
+                'Content-Type must be application/xml or application/x-ndjson', 415)
+            return
+        
+        import_id = next(import_ids)
+        started_at = time.perf_counter()
+        progress = {
+            'id': import_id,
+            'bytes_received': 0,
+            'records_read': 0,
+            'accepted': 0,
+            'rejected': 0
         }
+        errors = []
+        batch = []
+        failure = None
+        last_logged = [started_at]
         
-        # Add to storage
-        transactions_list.append(new_transaction)
-        transactions_dict[next_id] = new_transaction
-        next_id += 1
+        def count_bytes(chunks):
+            for chunk in chunks:
+                progress['bytes_received'] += len(chunk)
+                yield chunk
+        
+        def flush_batch():
+            add_transactions(batch)
+            progress['accepted'] += len(batch)
+            batch.clear()
+            
+            # Log progress at most once a second
+            now = time.perf_counter()
+            if now - last_logged[0] >= 1:
+                last_logged[0] = now
+                print(f"Import {import_id}: {progress['accepted']} accepted, "
+                      f"{progress['rejected']} rejected, {progress['bytes_received']} bytes read")
+        
+        active_imports[import_id] = progress
+        try:
+            body = count_bytes(iter_request_body(self.rfile, self.headers))
+            for record, error in parse_records(body):
+                progress['records_read'] += 1
+                
+                if error is None:
+                    missing_fields = [field for field in REQUIRED_FIELDS if field not in record]
+                    if missing_fields:
+                        error = f'Missing required fields: {", ".join(missing_fields)}'
+                    else:
+                        try:
+                            record['amount'] = parse_amount(record['amount'])
+                        except ValueError as e:
+                            error = str(e)
+                
+                if error is not None:
+                    progress['rejected'] += 1
+                    if len(errors) < IMPORT_MAX_ERRORS:
+                        errors.append({'record': progress['records_read'], 'message': error})
+                    continue
+                
+                batch.append(record)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    flush_batch()
+            
+            if batch:
+                flush_batch()
+        except ValueError as e:
+            # Malformed XML or a broken upload - keep what was already inserted
+            failure = str(e)
+        finally:
+            del active_imports[import_id]
+        
+        summary = dict(progress)
+        summary['errors'] = errors
+        summary['duration_seconds'] = round(time.perf_counter() - started_at, 3)
+        last_import = summary
+        print(f"Import {import_id} finished: {summary['accepted']} accepted, "
+              f"{summary['rejected']} rejected in {summary['duration_seconds']}s")
+        
+        if failure:
+            self._send_json_response({
+                'error': True,
+                'message': f'Import stopped: {failure}',
+                'status': 400,
+                'data': summary
+            }, 400)
+            return
         
-        # Return created transaction
         self._send_json_response({
             'success': True,
-            'message': 'Transaction created successfully',
-            'data': new_transaction
+            'message': f"Imported {summary['accepted']} transactions ({summary['rejected']} rejected)",
+            'data': summary
         }, 201)
     
     # ============================================================
@@ -218,6 +1026,12 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             self._send_json_response(get_auth_error_response(), 401)
             return
         
+        if not self._check_ready():
+            return
+        
+        if not self._admit():
+            return
+        
         endpoint, transaction_id = self._parse_path()
         
         if endpoint != 'transactions':
@@ -229,7 +1043,7 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             return
         
         # Check if transaction exists
-        if transaction_id not in transactions_dict:
+        if transaction_store.get(transaction_id) is None:
             self._send_error_response(f'Transaction with ID {transaction_id} not found', 404)
             return
         
@@ -240,34 +1054,49 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             self._send_error_response('Invalid JSON in request body', 400)
             return
         
-        # Update transaction (preserve ID)
-        existing_transaction = transactions_dict[transaction_id]
-        
-        # Update fields if provided
-        if 'type' in update_data:
-            existing_transaction['type'] = update_data['type']
         if 'amount' in update_data:
-            existing_transaction['amount'] = float(update_data['amount'])
-        if 'sender' in update_data:
-            existing_transaction['sender'] = update_data['sender']
-        if 'receiver' in update_data:
-            existing_transaction['receiver'] = update_data['receiver']
-        if 'timestamp' in update_data:
-            existing_transaction['timestamp'] = update_data['timestamp']
-        if 'status' in update_data:
-            existing_transaction['status'] = update_data['status']
-        
-        # Update in list as well
-        for i, trans in enumerate(transactions_list):
-            if trans['id'] == transaction_id:
-                transactions_list[i] = existing_transaction
-                break
+            try:
+                update_data['amount'] = parse_amount(update_data['amount'])
+            except ValueError as e:
+                self._send_error_response(str(e), 400)
+                return
+        
+        shard = transaction_store.shard_for(transaction_id)
+        with shard.lock:
+            # It may have been deleted while we were reading the body
+            existing_transaction = shard.records.get(transaction_id)
+            if existing_transaction is None:
+                self._send_error_response(f'Transaction with ID {transaction_id} not found', 404)
+                return
+            
+            # Work on a copy and swap it in, so snapshots taken by
+            # readers (e.g. a running export) never see a half-updated record
+            updated_transaction = dict(existing_transaction)
+            
+            # Update fields if provided (preserve ID)
+            if 'type' in update_data:
+                updated_transaction['type'] = update_data['type']
+            if 'amount' in update_data:
+                updated_transaction['amount'] = update_data['amount']
+            if 'sender' in update_data:
+                updated_transaction['sender'] = update_data['sender']
+            if 'receiver' in update_data:
+                updated_transaction['receiver'] = update_data['receiver']
+            if 'timestamp' in update_data:
+                updated_transaction['timestamp'] = update_data['timestamp']
+            if 'status' in update_data:
+                updated_transaction['status'] = update_data['status']
+            
+            # Swap it in and re-index in case sender/receiver/amount changed
+            shard.replace(updated_transaction)
+            response_cache.invalidate(transaction_id)
+            change_log.record('update', transaction_id, updated_transaction)
         
         # Return updated transaction
         self._send_json_response({
             'success': True,
             'message': f'Transaction {transaction_id} updated successfully',
-            'data': existing_transaction
+            'data': updated_transaction
         })
     
     # ============================================================
@@ -284,6 +1113,12 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             self._send_json_response(get_auth_error_response(), 401)
             return
         
+        if not self._check_ready():
+            return
+        
+        if not self._admit():
+            return
+        
         endpoint, transaction_id = self._parse_path()
         
         if endpoint != 'transactions':
@@ -295,18 +1130,20 @@ class TransactionAPIHandler(BaseHTTPRequestHandler):
             return
         
         # Check if transaction exists
-        if transaction_id not in transactions_dict:
+        if transaction_store.get(transaction_id) is None:
             self._send_error_response(f'Transaction with ID {transaction_id} not found', 404)
             return
         
-        # Get transaction before deleting (for response)
-        deleted_transaction = transactions_dict[transaction_id]
-        
-        # Delete from dictionary
-        del transactions_dict[transaction_id]
-        
-        # Delete from list
-        transactions_list[:] = [t for t in transactions_list if t['id'] != transaction_id]
+        shard = transaction_store.shard_for(transaction_id)
+        with shard.lock:
+            # Get transaction before deleting (for response)
+            deleted_transaction = shard.remove(transaction_id)
+            if deleted_transaction is None:
+                self._send_error_response(f'Transaction with ID {transaction_id} not found', 404)
+                return
+            
+            response_cache.invalidate(transaction_id)
+            change_log.record('delete', transaction_id, deleted_transaction)
         
         # Return success response
         self._send_json_response({
@@ -337,12 +1174,12 @@ def run_server(host='localhost', port=8000):
         host (str): Server host address
         port (int): Server port number
     """
-    # Initialize data
-    initialize_data()
-    
     # Create server
     server_address = (host, port)
-    httpd = HTTPServer(server_address, TransactionAPIHandler)
+    httpd = ThreadingHTTPServer(server_address, TransactionAPIHandler)
+    
+    # Load data in the background so /healthz and /readyz answer right away
+    threading.Thread(target=load_data_in_background, name='data-loader', daemon=True).start()
     
     print("=" * 60)
     print("MoMo Transaction REST API Server")
@@ -351,9 +1188,16 @@ def run_server(host='localhost', port=8000):
     print("\nEndpoints:")
     print(f"  GET    http://{host}:{port}/transactions")
     print(f"  GET    http://{host}:{port}/transactions/{{id}}")
+    print(f"  GET    http://{host}:{port}/transactions?sender_prefix=25078")
+    print(f"  GET    http://{host}:{port}/transactions?sort=amount&order=desc&limit=100")
+    print(f"  GET    http://{host}:{port}/transactions/export?format=ndjson")
+    print(f"  GET    http://{host}:{port}/transactions/changes?since=0")
     print(f"  POST   http://{host}:{port}/transactions")
+    print(f"  POST   http://{host}:{port}/transactions/import")
     print(f"  PUT    http://{host}:{port}/transactions/{{id}}")
     print(f"  DELETE http://{host}:{port}/transactions/{{id}}")
+    print(f"  GET    http://{host}:{port}/healthz")
+    print(f"  GET    http://{host}:{port}/readyz")
     print("\nAuthentication: Basic Auth (username: admin, password: password)")
     print("\nPress Ctrl+C to stop the server")
     print("=" * 60)
@@ -7,39 +7,82 @@ Using ElementTree because it's built into Python.
 
 import xml.etree.ElementTree as ET
 import json
+import math
 import os
 
 
-def parse_xml_to_json(xml_file_path):
+def element_to_transaction(transaction_elem):
     """
-    Parse the XML file and return a list of transaction dicts
+    Build a transaction dict from one <transaction> element.
     """
-    try:
-        # Parse the XML file
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-        
-        transactions = []
+    # Extract the id attribute
+    transaction_id = transaction_elem.get('id')
+    
+    # Build dictionary from child elements
+    return {
+        'id': int(transaction_id) if transaction_id else None,
+        'type': transaction_elem.find('type').text if transaction_elem.find('type') is not None else '',
+        'amount': float(transaction_elem.find('amount').text) if transaction_elem.find('amount') is not None else 0.0,
+        'sender': transaction_elem.find('sender').text if transaction_elem.find('sender') is not None else '',
+        'receiver': transaction_elem.find('receiver').text if transaction_elem.find('receiver') is not None else '',
+        'timestamp': transaction_elem.find('timestamp').text if transaction_elem.find('timestamp') is not None else '',
+        'status': transaction_elem.find('status').text if transaction_elem.find('status') is not None else 'pending'
+    }
+
+
+def load_transactions(xml_file_path, progress_callback=None):
+    """
+    Parse the XML file and return a list of transaction dicts.
+    Unlike parse_xml_to_json, errors are raised instead of printed,
+    so callers can tell a broken file apart from an empty one.
+    
+    The file is read incrementally, so big files can report progress.
+    
+    Args:
+        xml_file_path (str): Path to the XML file
+        progress_callback (callable): Optional, called as
+            progress_callback(bytes_read, total_bytes, records_loaded)
+    
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ET.ParseError: If the XML is malformed
+    """
+    transactions = []
+    
+    with open(xml_file_path, 'rb') as xml_file:
+        total_bytes = os.fstat(xml_file.fileno()).st_size
+        root = None
+        depth = 0
         
-        # Iterate through each transaction element
-        for transaction_elem in root.findall('transaction'):
-            # Extract the id attribute
-            transaction_id = transaction_elem.get('id')
-            
-            # Build dictionary from child elements
-            transaction = {
-                'id': int(transaction_id) if transaction_id else None,
-                'type': transaction_elem.find('type').text if transaction_elem.find('type') is not None else '',
-                'amount': float(transaction_elem.find('amount').text) if transaction_elem.find('amount') is not None else 0.0,
-                'sender': transaction_elem.find('sender').text if transaction_elem.find('sender') is not None else '',
-                'receiver': transaction_elem.find('receiver').text if transaction_elem.find('receiver') is not None else '',
-                'timestamp': transaction_elem.find('timestamp').text if transaction_elem.find('timestamp') is not None else '',
-                'status': transaction_elem.find('status').text if transaction_elem.find('status') is not None else 'pending'
-            }
+        # Only <transaction> elements directly under the root count
+        for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
             
-            transactions.append(transaction)
-        
-        return transactions
+            depth -= 1
+            if depth == 1 and elem.tag == 'transaction':
+                transaction = element_to_transaction(elem)
+                # NaN and infinity can't be ordered, so they'd break the amount index
+                if math.isfinite(transaction['amount']):
+                    transactions.append(transaction)
+                else:
+                    print(f"Skipping transaction {transaction['id']}: invalid amount {transaction['amount']}")
+                root.clear()  # free elements we've already read
+                if progress_callback:
+                    progress_callback(xml_file.tell(), total_bytes, len(transactions))
+    
+    return transactions
+
+
+def parse_xml_to_json(xml_file_path, progress_callback=None):
+    """
+    Parse the XML file and return a list of transaction dicts
+    """
+    try:
+        return load_transactions(xml_file_path, progress_callback)
     
     except FileNotFoundError:
         print(f"Error: File '{xml_file_path}' not found.")
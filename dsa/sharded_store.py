@@ -0,0 +1,350 @@
+"""
+Sharded Store - transactions split across independently locked shards
+
+Transactions are spread over N shards by ID hash. Each shard has its own
+lock, records and indexes (sender/receiver tries, amount index), so a
+write only blocks writes and reads that land on the same shard instead of
+the whole store.
+
+- New IDs come from an itertools.count, whose next() is atomic, so
+  allocating an ID takes no lock at all
+- Lookups by ID: O(1), one dict read without locking
+- Lists and searches: each shard answers on its own, then the results are
+  merged, ordered by ID (or by amount, then ID) so the order is stable
+  no matter how many shards there are
+
+Run this file directly to benchmark write throughput against thread count.
+"""
+
+import bisect
+import contextlib
+import heapq
+import itertools
+import os
+import sys
+import threading
+from operator import itemgetter
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dsa.trie import PrefixTrie, build_trie
+from dsa.sorted_index import SortedIndex, build_sorted_index
+
+
+by_id = itemgetter('id')
+
+
+def by_amount(transaction):
+    """Sort key for amount order, ties broken by ID (same as SortedIndex)."""
+    return (transaction['amount'], transaction['id'])
+
+
+class Shard:
+    """
+    One part of the store. Callers must hold `lock` while calling
+    add/replace/remove, and may hold it across several calls to make them
+    one atomic step.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.records = {}  # id -> transaction
+        self.sorted_ids = []  # IDs in order, so "first N by ID" doesn't sort
+        self.sender_index = PrefixTrie()
+        self.receiver_index = PrefixTrie()
+        self.amount_index = SortedIndex()
+
+    def _index(self, transaction):
+        self.sender_index.insert(transaction.get('sender'), transaction['id'])
+        self.receiver_index.insert(transaction.get('receiver'), transaction['id'])
+        self.amount_index.insert(transaction['amount'], transaction['id'])
+
+    def _unindex(self, transaction):
+        self.sender_index.remove(transaction.get('sender'), transaction['id'])
+        self.receiver_index.remove(transaction.get('receiver'), transaction['id'])
+        self.amount_index.remove(transaction['amount'], transaction['id'])
+
+    def add(self, transaction):
+        """Add a transaction whose ID isn't in the shard yet."""
+        self.records[transaction['id']] = transaction
+        bisect.insort(self.sorted_ids, transaction['id'])
+        self._index(transaction)
+
+    def replace(self, transaction):
+        """Swap in a new version of an existing transaction and re-index it."""
+        self._unindex(self.records[transaction['id']])
+        self.records[transaction['id']] = transaction
+        self._index(transaction)
+
+    def remove(self, transaction_id):
+        """Remove a transaction. Returns it, or None if it wasn't there."""
+        transaction = self.records.pop(transaction_id, None)
+        if transaction is not None:
+            i = bisect.bisect_left(self.sorted_ids, transaction_id)
+            del self.sorted_ids[i]
+            self._unindex(transaction)
+        return transaction
+
+    def search(self, sender_prefix=None, receiver_prefix=None, min_amount=None,
+               max_amount=None, sort=None, descending=False, limit=None):
+        """
+        Search this shard only. Takes the shard lock.
+
+        Returns:
+            list: Matching transactions - by amount if sort='amount',
+            otherwise by ID - at most `limit` of them
+        """
+        with self.lock:
+            # Prefix lookups with the tries
+            allowed_ids = None
+            if sender_prefix is not None:
+                allowed_ids = self.sender_index.search(sender_prefix)
+            if receiver_prefix is not None:
+                receiver_ids = self.receiver_index.search(receiver_prefix)
+                allowed_ids = receiver_ids if allowed_ids is None else allowed_ids & receiver_ids
+
+            if sort == 'amount' or min_amount is not None or max_amount is not None:
+                # Walk only the matching part of the amount index, and for
+                # sort=amount stop after `limit` results (top-K is O(k))
+                results = []
+                for transaction_id in self.amount_index.range(min_amount, max_amount, descending):
+                    if allowed_ids is not None and transaction_id not in allowed_ids:
+                        continue
+                    transaction = self.records.get(transaction_id)
+                    if transaction is None:
+                        continue  # stale index entry
+                    results.append(transaction)
+                    if sort == 'amount' and limit is not None and len(results) >= limit:
+                        break
+                if sort != 'amount':
+                    results.sort(key=by_id)
+            elif allowed_ids is not None:
+                # A short prefix can match most of the shard, so with a limit
+                # only pick the smallest IDs instead of sorting all of them
+                live_ids = (i for i in allowed_ids if i in self.records)
+                ids = sorted(live_ids) if limit is None else heapq.nsmallest(limit, live_ids)
+                results = [self.records[i] for i in ids]
+            else:
+                # Only read the first `limit` IDs instead of sorting the shard
+                ids = self.sorted_ids if limit is None else self.sorted_ids[:limit]
+                results = [self.records[i] for i in ids]
+
+        return results[:limit] if limit is not None else results
+
+
+class ShardedStore:
+    """In-memory transaction store split into `num_shards` locked shards."""
+
+    def __init__(self, num_shards=16, first_id=1):
+        self.shards = [Shard() for _ in range(num_shards)]
+        self._ids = itertools.count(first_id)
+        self._id_lock = threading.Lock()  # only taken by reserve_ids
+
+    def shard_for(self, transaction_id):
+        """Return the shard a transaction ID lives in."""
+        return self.shards[hash(transaction_id) % len(self.shards)]
+
+    def allocate_id(self):
+        """
+        Return a new transaction ID without taking any lock.
+
+        An ID can still turn out to be taken by a record that was loaded
+        with its own ID (see reserve_ids), so callers check the shard
+        under its lock and allocate again if needed.
+        """
+        return next(self._ids)
+
+    def reserve_ids(self, highest_id):
+        """
+        Make sure IDs allocated from now on are above highest_id.
+
+        The counter is advanced, never replaced, so it can't go back to IDs
+        that were already handed out. This uses up one ID even when the
+        counter is already past highest_id, and costs O(gap) otherwise.
+        """
+        with self._id_lock:
+            current = next(self._ids)
+            if highest_id > current:
+                # Skip current + 1 .. highest_id
+                next(itertools.islice(self._ids, highest_id - current - 1, None))
+
+    def get(self, transaction_id):
+        """Look up a transaction by ID (a single dict read, so no lock needed)."""
+        return self.shard_for(transaction_id).records.get(transaction_id)
+
+    @contextlib.contextmanager
+    def locked_all(self):
+        """
+        Hold every shard's lock, for changes that must be atomic across the
+        whole store. Locks are always taken in shard order, and nothing
+        else holds more than one shard lock, so this can't deadlock.
+        """
+        with contextlib.ExitStack() as stack:
+            for shard in self.shards:
+                stack.enter_context(shard.lock)
+            yield
+
+    def iter_snapshot(self):
+        """
+        Iterate over every transaction, ordered by ID, as of one point in time.
+
+        The shard locks are only held while each shard's records are copied
+        in sorted_ids order - one list of references per shard, O(n) in
+        total but no record copies. The copies are then merged lazily with
+        heapq.merge, so nothing is sorted and the caller can start sending
+        rows right away.
+        """
+        with self.locked_all():
+            parts = [[shard.records[i] for i in shard.sorted_ids] for shard in self.shards]
+        return heapq.merge(*parts, key=by_id)
+
+    def snapshot(self):
+        """Return every transaction, ordered by ID, as of one point in time."""
+        return list(self.iter_snapshot())
+
+    def search(self, sender_prefix=None, receiver_prefix=None, min_amount=None,
+               max_amount=None, sort=None, descending=False, limit=None):
+        """
+        Combine prefix, amount range, sorting and limit across all shards.
+
+        Each shard returns its own sorted (and limited) results, and those
+        are merged lazily, so top-K reads at most K results per shard.
+
+        Returns:
+            list: Matching transactions - by amount if sort='amount',
+            otherwise by ID
+        """
+        parts = [shard.search(sender_prefix, receiver_prefix, min_amount, max_amount,
+                              sort, descending, limit)
+                 for shard in self.shards]
+
+        if sort == 'amount':
+            merged = heapq.merge(*parts, key=by_amount, reverse=descending)
+        else:
+            merged = heapq.merge(*parts, key=by_id)
+        return list(itertools.islice(merged, limit))
+
+    def stats(self):
+        """Return shard count and how evenly the records are spread."""
+        sizes = [len(shard.records) for shard in self.shards]
+        return {
+            'shards': len(self.shards),
+            'records': sum(sizes),
+            'smallest_shard': min(sizes),
+            'largest_shard': max(sizes)
+        }
+
+    def __len__(self):
+        return sum(len(shard.records) for shard in self.shards)
+
+
+def build_sharded_store(transactions_list, num_shards=16):
+    """
+    Build a store from a list of transactions that already have IDs.
+
+    Args:
+        transactions_list (list): List of transaction dictionaries
+        num_shards (int): Number of shards to split them over
+
+    Returns:
+        ShardedStore: Populated store, allocating IDs after the highest one
+    """
+    first_id = max((t['id'] for t in transactions_list), default=0) + 1
+    store = ShardedStore(num_shards, first_id)
+    parts = [[] for _ in store.shards]
+    for transaction in transactions_list:
+        parts[hash(transaction['id']) % num_shards].append(transaction)
+
+    for shard, part in zip(store.shards, parts):
+        shard.records = {t['id']: t for t in part}
+        shard.sorted_ids = sorted(shard.records)
+        shard.sender_index = build_trie(part, 'sender')
+        shard.receiver_index = build_trie(part, 'receiver')
+        shard.amount_index = build_sorted_index(part, 'amount')
+
+    return store
+
+
+def run_benchmark(writes_per_thread=20000, preload=100000):
+    """
+    Measure write throughput (create + update + delete, each under the
+    shard lock) with one shard - the same as a single global lock - and
+    with 16 shards, for a growing number of writer threads.
+    """
+    import random
+    import time
+
+    def make_store(num_shards):
+        return build_sharded_store([{
+            'id': i,
+            'type': 'Send Money',
+            'amount': float(random.randrange(100, 1000000)),
+            'sender': f'25078{i:07d}',
+            'receiver': '250780000002',
+            'timestamp': '2026-01-15T10:30:00',
+            'status': 'completed'
+        } for i in range(1, preload + 1)], num_shards)
+
+    def writer(store, count, wait_times):
+        waited = 0.0
+        for i in range(count):
+            transaction_id = store.allocate_id()
+            shard = store.shard_for(transaction_id)
+            transaction = {
+                'id': transaction_id,
+                'type': 'Send Money',
+                'amount': float(random.randrange(100, 1000000)),
+                'sender': f'25079{transaction_id:07d}',
+                'receiver': '250780000002',
+                'timestamp': '2026-01-15T10:30:00',
+                'status': 'pending'
+            }
+            before = time.perf_counter()
+            with shard.lock:
+                waited += time.perf_counter() - before
+                shard.add(transaction)
+                # Every other write also updates, every fourth deletes
+                if i % 2:
+                    updated = dict(transaction, status='completed')
+                    shard.replace(updated)
+                if i % 4 == 3:
+                    shard.remove(transaction_id)
+        wait_times.append(waited)
+
+    print("=" * 60)
+    print("SHARDED STORE WRITE BENCHMARK")
+    print("=" * 60)
+    print(f"Preloaded records: {preload}, writes per thread: {writes_per_thread}")
+    print("Each write takes the shard lock and updates the tries and amount index.")
+
+    for num_shards in (1, 16):
+        label = 'single lock (1 shard)' if num_shards == 1 else f'{num_shards} shards'
+        print(f"\n{label}:")
+        print(f"  {'threads':>7}  {'writes/sec':>12}  {'avg lock wait':>14}")
+        for num_threads in (1, 2, 4, 8):
+            store = make_store(num_shards)
+            wait_times = []
+            threads = [threading.Thread(target=writer, args=(store, writes_per_thread, wait_times))
+                       for _ in range(num_threads)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            total_writes = num_threads * writes_per_thread
+            avg_wait_us = sum(wait_times) / total_writes * 1e6
+            print(f"  {num_threads:>7}  {total_writes / elapsed:>12.0f}  {avg_wait_us:>11.2f} us")
+
+    if getattr(sys, '_is_gil_enabled', lambda: True)():
+        print("\nNote: this Python has a GIL, so threads take turns running Python")
+        print("code and throughput can't grow past one core. Sharding still cuts")
+        print("lock waits (a thread paused while holding a lock only blocks its")
+        print("own shard) and makes each index smaller, so inserts are cheaper.")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
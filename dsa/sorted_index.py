@@ -0,0 +1,98 @@
+"""
+Sorted Index - amount lookups
+
+Keeps (amount, id) pairs in a sorted list so we can answer
+"transactions between X and Y" and "the K largest transactions"
+without scanning everything.
+
+- Range boundaries: O(log n) with binary search (bisect)
+- Top-K: O(k), just read from the end of the list
+- Insert/remove: O(log n) to find the spot, plus a fast memmove to shift
+"""
+
+import bisect
+import itertools
+
+
+class SortedIndex:
+    """Sorted list of (value, transaction_id) pairs."""
+
+    def __init__(self):
+        self.entries = []
+
+    def insert(self, value, transaction_id):
+        """Add a transaction under the given value."""
+        bisect.insort(self.entries, (value, transaction_id))
+
+    def remove(self, value, transaction_id):
+        """Remove a transaction that was added under the given value."""
+        i = bisect.bisect_left(self.entries, (value, transaction_id))
+        if i < len(self.entries) and self.entries[i] == (value, transaction_id):
+            del self.entries[i]
+            return
+
+        # NaN doesn't compare equal to itself, so bisect can't find it;
+        # fall back to a linear scan by ID so the entry doesn't stay forever
+        if value != value:
+            for i, (_, entry_id) in enumerate(self.entries):
+                if entry_id == transaction_id:
+                    del self.entries[i]
+                    return
+
+    def range(self, low=None, high=None, descending=False):
+        """
+        Iterate over transaction IDs with low <= value <= high.
+
+        Args:
+            low (float): Smallest value to include (None = no lower bound)
+            high (float): Largest value to include (None = no upper bound)
+            descending (bool): Largest values first
+
+        Yields:
+            int: Transaction IDs in value order (ties broken by ID)
+        """
+        start = 0 if low is None else bisect.bisect_left(self.entries, (low,))
+        end = len(self.entries) if high is None else bisect.bisect_right(self.entries, (high, float('inf')))
+
+        if descending:
+            positions = range(end - 1, start - 1, -1)
+        else:
+            positions = range(start, end)
+        for i in positions:
+            yield self.entries[i][1]
+
+    def top(self, k):
+        """Return the IDs of the k largest values, largest first."""
+        return list(itertools.islice(self.range(descending=True), k))
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def build_sorted_index(transactions_list, field):
+    """
+    Build a sorted index over one field of every transaction.
+
+    Args:
+        transactions_list (list): List of transaction dictionaries
+        field (str): Field to index (e.g. 'amount')
+
+    Returns:
+        SortedIndex: Populated index
+    """
+    index = SortedIndex()
+    index.entries = sorted((t[field], t['id']) for t in transactions_list)
+    return index
+
+
+if __name__ == "__main__":
+    index = SortedIndex()
+    for transaction_id, amount in enumerate([5000, 3000, 10000, 20000, 7500, 500000, 750000], start=1):
+        index.insert(amount, transaction_id)
+
+    print(f"Amounts 5000-20000  -> IDs {list(index.range(5000, 20000))}")
+    print(f"Above 500000        -> IDs {list(index.range(low=500000))}")
+    print(f"Top 3 by amount     -> IDs {index.top(3)}")
+
+    index.remove(750000, 7)
+    print(f"Top 3 after removal -> IDs {index.top(3)}")
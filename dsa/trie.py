@@ -0,0 +1,135 @@
+"""
+Prefix Trie - phone number index
+
+Lets us find every transaction whose sender/receiver starts with a given
+prefix (e.g. all numbers starting with '25078') without scanning the list.
+Each node keeps the set of transaction IDs below it, so a lookup costs
+O(k) to walk the prefix plus O(r) to copy out the r matching IDs.
+"""
+
+
+class TrieNode:
+    """One character position in the trie."""
+
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}  # char -> TrieNode
+        self.ids = set()    # IDs of every key that passes through this node
+
+
+class PrefixTrie:
+    """
+    Maps string keys (phone numbers, agent codes) to transaction IDs
+    and answers "which IDs have a key starting with X?" queries.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.size = 0
+
+    def insert(self, key, transaction_id):
+        """
+        Add a transaction ID under the given key.
+
+        Args:
+            key (str): Value to index (e.g. the sender number)
+            transaction_id (int): ID of the transaction
+        """
+        if key is None:
+            return
+        node = self.root
+        node.ids.add(transaction_id)
+        for char in str(key):
+            child = node.children.get(char)
+            if child is None:
+                child = TrieNode()
+                node.children[char] = child
+            node = child
+            node.ids.add(transaction_id)
+        self.size += 1
+
+    def remove(self, key, transaction_id):
+        """
+        Remove a transaction ID from the given key.
+        Empty branches are pruned so the trie doesn't keep growing.
+
+        Args:
+            key (str): Value the ID was indexed under
+            transaction_id (int): ID of the transaction
+        """
+        if key is None:
+            return
+        key = str(key)
+
+        # Walk down first, remembering the path so we can prune afterwards
+        path = [self.root]
+        node = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None or transaction_id not in node.ids:
+                return  # was never indexed under this key
+            path.append(node)
+
+        for node in path:
+            node.ids.discard(transaction_id)
+
+        # Drop child nodes that no longer lead anywhere
+        for depth in range(len(key), 0, -1):
+            if path[depth].ids:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+
+        self.size -= 1
+
+    def search(self, prefix):
+        """
+        Find all transaction IDs whose key starts with prefix.
+
+        Args:
+            prefix (str): Prefix to match
+
+        Returns:
+            set: Matching transaction IDs (a copy, safe to modify)
+        """
+        node = self.root
+        for char in str(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return set(node.ids)
+
+    def __len__(self):
+        return self.size
+
+
+def build_trie(transactions_list, field):
+    """
+    Build a trie over one field of every transaction.
+
+    Args:
+        transactions_list (list): List of transaction dictionaries
+        field (str): Field to index ('sender' or 'receiver')
+
+    Returns:
+        PrefixTrie: Populated trie
+    """
+    trie = PrefixTrie()
+    for transaction in transactions_list:
+        trie.insert(transaction.get(field), transaction['id'])
+    return trie
+
+
+if __name__ == "__main__":
+    trie = PrefixTrie()
+    trie.insert('250780000001', 1)
+    trie.insert('250780000002', 2)
+    trie.insert('250790000003', 3)
+    trie.insert('AGENT001', 4)
+
+    print(f"Prefix '25078'  -> {sorted(trie.search('25078'))}")
+    print(f"Prefix '2507'   -> {sorted(trie.search('2507'))}")
+    print(f"Prefix 'AGENT'  -> {sorted(trie.search('AGENT'))}")
+
+    trie.remove('250780000001', 1)
+    print(f"After removing 1, '25078' -> {sorted(trie.search('25078'))}")
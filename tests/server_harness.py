@@ -0,0 +1,104 @@
+"""
+Test helper - runs the API on a random local port for tests that talk HTTP.
+"""
+
+import base64
+import http.client
+import json
+import os
+import sys
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dsa.sharded_store import build_sharded_store
+from api import server
+from api.admission import AdmissionController
+from api.changes import ChangeLog
+from api.idempotency import IdempotencyCache
+
+
+AUTH_HEADER = 'Basic ' + base64.b64encode(b'admin:password').decode()
+
+
+def make_transaction(transaction_id, amount, sender='250780000001', receiver='250780000002'):
+    return {
+        'id': transaction_id,
+        'type': 'Send Money',
+        'amount': float(amount),
+        'sender': sender,
+        'receiver': receiver,
+        'timestamp': '2026-01-15T10:30:00',
+        'status': 'completed'
+    }
+
+
+class QuietHandler(server.TransactionAPIHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class ServerTestCase(unittest.TestCase):
+    """
+    Starts the API once per class. Each test gets a fresh store holding
+    `transactions`, and the server's globals are put back afterwards.
+    """
+
+    transactions = [make_transaction(i, 1000 * i) for i in range(1, 6)]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.httpd = ThreadingHTTPServer(('127.0.0.1', 0), QuietHandler)
+        cls.port = cls.httpd.server_address[1]
+        threading.Thread(target=cls.httpd.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+
+    def setUp(self):
+        self.patch_server('transaction_store', build_sharded_store([dict(t) for t in self.transactions]))
+        self.patch_server('admission_controller', AdmissionController(rate_per_second=0))
+        self.patch_server('idempotency_cache', IdempotencyCache())
+        self.patch_server('change_log', ChangeLog())
+        server.response_cache.clear()
+        self.addCleanup(server.response_cache.clear)
+
+        if not server.data_ready.is_set():
+            server.data_ready.set()
+            self.addCleanup(server.data_ready.clear)
+
+    def patch_server(self, name, value):
+        """Replace a module global in api.server for the length of one test."""
+        self.addCleanup(setattr, server, name, getattr(server, name))
+        setattr(server, name, value)
+
+    def request(self, method, path, body=None, headers=None, raw=False):
+        """
+        Send one request as admin.
+
+        Returns:
+            tuple: (status code, response headers, body) - the body is parsed
+            if it's JSON and raw is False, otherwise returned as bytes
+        """
+        all_headers = {'Authorization': AUTH_HEADER}
+        all_headers.update(headers or {})
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            all_headers.setdefault('Content-Type', 'application/json')
+
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+        try:
+            connection.request(method, path, body=body, headers=all_headers)
+            response = connection.getresponse()
+            data = response.read()
+        finally:
+            connection.close()
+
+        if not raw and response.getheader('Content-Type', '').startswith('application/json'):
+            data = json.loads(data)
+        return response.status, response.headers, data
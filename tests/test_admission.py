@@ -0,0 +1,78 @@
+"""
+Tests for admission control: which requests count as heavy, and the
+controller's slots, long-poll pool and per-user rate limit.
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import server
+from api.admission import AdmissionController
+
+
+class TestCheapSearch(unittest.TestCase):
+    """Regression: any prefix used to count as cheap, even ?sender_prefix=2."""
+
+    def test_short_prefix_without_limit_is_heavy(self):
+        for query in ({'sender_prefix': '2'}, {'receiver_prefix': '25078'},
+                      {'sender_prefix': '2507', 'limit': str(server.MAX_CHEAP_LIMIT + 1)}):
+            with self.subTest(**query):
+                self.assertFalse(server.is_cheap_search(query))
+
+    def test_long_prefix_or_small_limit_is_cheap(self):
+        for query in ({'sender_prefix': '25078000'}, {'receiver_prefix': '250780000002'},
+                      {'sender_prefix': '2', 'limit': '20'},
+                      {'sort': 'amount', 'limit': str(server.MAX_CHEAP_LIMIT)}):
+            with self.subTest(**query):
+                self.assertTrue(server.is_cheap_search(query))
+
+    def test_other_lists_are_heavy(self):
+        for query in ({}, {'limit': '10'}, {'min_amount': '0'}, {'sort': 'amount'},
+                      {'sort': 'amount', 'limit': 'lots'}):
+            with self.subTest(**query):
+                self.assertFalse(server.is_cheap_search(query))
+
+
+class TestAdmissionController(unittest.TestCase):
+
+    def test_in_flight_limit(self):
+        controller = AdmissionController(max_in_flight=2, rate_per_second=0)
+        self.assertIsNone(controller.acquire('a'))
+        self.assertIsNone(controller.acquire('a'))
+        self.assertEqual(controller.acquire('a'), (503, 1))
+        controller.release()
+        self.assertIsNone(controller.acquire('a'))
+
+    def test_heavy_requests_get_a_smaller_share(self):
+        controller = AdmissionController(max_in_flight=3, max_heavy_in_flight=1, rate_per_second=0)
+        self.assertIsNone(controller.acquire('a', heavy=True))
+        self.assertEqual(controller.acquire('a', heavy=True), (503, 1))
+        self.assertIsNone(controller.acquire('a'))
+
+    def test_long_polls_do_not_use_in_flight_slots(self):
+        controller = AdmissionController(max_in_flight=1, rate_per_second=0, max_long_polls=2)
+        self.assertIsNone(controller.acquire('a', long_poll=True))
+        self.assertIsNone(controller.acquire('a', long_poll=True))
+        self.assertEqual(controller.acquire('a', long_poll=True), (503, 1))
+        self.assertIsNone(controller.acquire('a'))
+
+        controller.release(long_poll=True)
+        stats = controller.stats()
+        self.assertEqual((stats['in_flight'], stats['long_polls']), (1, 1))
+
+    def test_rate_limit_is_per_user(self):
+        controller = AdmissionController(max_in_flight=100, rate_per_second=1, burst=2)
+        self.assertIsNone(controller.acquire('a'))
+        self.assertIsNone(controller.acquire('a'))
+        status_code, retry_after = controller.acquire('a')
+        self.assertEqual(status_code, 429)
+        self.assertGreaterEqual(retry_after, 1)
+        self.assertIsNone(controller.acquire('b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
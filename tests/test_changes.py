@@ -0,0 +1,60 @@
+"""
+Tests for the change log behind GET /changes.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.changes import ChangeLog
+
+
+class TestChangeLog(unittest.TestCase):
+
+    def test_since_returns_newer_changes_in_order(self):
+        log = ChangeLog()
+        for transaction_id in (1, 2, 3):
+            log.record('create', transaction_id)
+        changes, latest = log.since(1)
+        self.assertEqual([c['seq'] for c in changes], [2, 3])
+        self.assertEqual(latest, 3)
+
+        changes, _ = log.since(0, limit=2)
+        self.assertEqual([c['id'] for c in changes], [1, 2])
+
+    def test_dropped_changes_require_a_resync(self):
+        log = ChangeLog(max_entries=2)
+        for transaction_id in (1, 2, 3):
+            log.record('create', transaction_id)
+        self.assertEqual(log.since(0), (None, 3))
+        changes, _ = log.since(1)
+        self.assertEqual([c['seq'] for c in changes], [2, 3])
+        self.assertEqual(log.stats()['oldest_seq'], 2)
+
+    def test_position_ahead_of_log_requires_a_resync(self):
+        log = ChangeLog()
+        log.record('create', 1)
+        self.assertEqual(log.since(5), (None, 1))
+
+    def test_long_poll_wakes_up_on_new_change(self):
+        log = ChangeLog()
+        timer = threading.Timer(0.05, log.record, args=('delete', 7))
+        timer.start()
+        started = time.monotonic()
+        changes, latest = log.since(0, timeout=5)
+        timer.join()
+        self.assertLess(time.monotonic() - started, 4)
+        self.assertEqual([(c['op'], c['id']) for c in changes], [('delete', 7)])
+
+    def test_long_poll_times_out_with_no_changes(self):
+        log = ChangeLog()
+        self.assertEqual(log.since(0, timeout=0.01), ([], 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Tests for the streaming export: NDJSON/CSV rows, ?fields= parsing and the
+chunked framing of GET /transactions/export.
+"""
+
+import csv
+import io
+import json
+import os
+import socket
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import export
+from api.export import TRANSACTION_FIELDS, parse_field_list, iter_export
+from server_harness import AUTH_HEADER, ServerTestCase, make_transaction
+
+
+def decode_chunked(body):
+    """Undo chunked transfer encoding, checking every chunk's size line."""
+    chunks = []
+    while True:
+        size_line, _, body = body.partition(b'\r\n')
+        size = int(size_line, 16)
+        if size == 0:
+            assert body == b'\r\n', 'missing final CRLF'
+            return chunks
+        chunk, crlf, body = body[:size], body[size:size + 2], body[size + 2:]
+        assert len(chunk) == size and crlf == b'\r\n', 'bad chunk framing'
+        chunks.append(chunk)
+
+
+class TestParseFieldList(unittest.TestCase):
+
+    def test_default_is_every_field(self):
+        self.assertEqual(parse_field_list(None), TRANSACTION_FIELDS)
+        self.assertEqual(parse_field_list(''), TRANSACTION_FIELDS)
+
+    def test_keeps_order_and_drops_duplicates(self):
+        self.assertEqual(parse_field_list('amount, id,amount,,status'), ['amount', 'id', 'status'])
+
+    def test_unknown_or_empty_list_is_rejected(self):
+        for value in ('id,balance', ',,'):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_field_list(value)
+
+
+class TestIterExport(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [make_transaction(1, 500), make_transaction(2, 2500, sender='a,"b"')]
+
+    def test_ndjson_has_one_compact_object_per_line(self):
+        body = b''.join(iter_export(self.transactions, ['id', 'sender'], 'ndjson'))
+        lines = body.decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         [{'id': 1, 'sender': '250780000001'}, {'id': 2, 'sender': 'a,"b"'}])
+        self.assertNotIn(' ', lines[0])
+
+    def test_csv_has_header_and_quotes_values(self):
+        body = b''.join(iter_export(self.transactions, ['id', 'amount', 'sender'], 'csv'))
+        rows = list(csv.reader(io.StringIO(body.decode('utf-8'))))
+        self.assertEqual(rows, [['id', 'amount', 'sender'],
+                                ['1', '500.0', '250780000001'],
+                                ['2', '2500.0', 'a,"b"']])
+
+    def test_rows_are_grouped_into_chunks(self):
+        transactions = [make_transaction(i, i) for i in range(1, 3001)]
+        chunks = list(iter_export(transactions, TRANSACTION_FIELDS, 'ndjson'))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) >= export.EXPORT_CHUNK_SIZE for chunk in chunks[:-1]))
+        self.assertEqual(b''.join(chunks).count(b'\n'), 3000)
+
+    def test_empty_export(self):
+        self.assertEqual(list(iter_export([], ['id'], 'ndjson')), [])
+        self.assertEqual(b''.join(iter_export([], ['id'], 'csv')), b'id\r\n')
+
+
+class TestExportEndpoint(ServerTestCase):
+
+    transactions = [make_transaction(i, 10 * i) for i in range(1, 3001)]
+
+    def raw_get(self, path, version='HTTP/1.1'):
+        """Send a GET on a plain socket and return (head, raw body) as sent."""
+        with socket.create_connection(('127.0.0.1', self.port), timeout=10) as sock:
+            sock.sendall(f'GET {path} {version}\r\nHost: test\r\n'
+                         f'Authorization: {AUTH_HEADER}\r\n\r\n'.encode('ascii'))
+            response = b''
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                response += data
+        head, _, body = response.partition(b'\r\n\r\n')
+        return head.decode('iso-8859-1'), body
+
+    def test_chunked_ndjson_export(self):
+        head, body = self.raw_get('/transactions/export?fields=id,amount')
+        self.assertIn('200', head.split('\r\n')[0])
+        self.assertIn('Transfer-Encoding: chunked', head)
+        self.assertIn('Content-Type: application/x-ndjson', head)
+
+        chunks = decode_chunked(body)
+        self.assertGreater(len(chunks), 1)
+        rows = [json.loads(line) for line in b''.join(chunks).splitlines()]
+        self.assertEqual(rows, [{'id': i, 'amount': 10.0 * i} for i in range(1, 3001)])
+
+    def test_http_1_0_export_is_not_chunked(self):
+        head, body = self.raw_get('/transactions/export?format=csv&fields=id', version='HTTP/1.0')
+        self.assertNotIn('Transfer-Encoding', head)
+        self.assertEqual(body.decode('utf-8').split('\r\n')[:3], ['id', '1', '2'])
+
+    def test_export_sees_writes_made_before_it(self):
+        self.request('DELETE', '/transactions/2')
+        self.request('PUT', '/transactions/3', {'status': 'refunded'})
+        status, _, body = self.request('GET', '/transactions/export?format=csv&fields=id,status')
+        self.assertEqual(status, 200)
+        rows = list(csv.reader(io.StringIO(body.decode('utf-8'))))
+        self.assertEqual(rows[:3], [['id', 'status'], ['1', 'completed'], ['3', 'refunded']])
+
+    def test_bad_format_or_field_is_a_400(self):
+        for path in ('/transactions/export?format=xml', '/transactions/export?fields=balance'):
+            with self.subTest(path=path):
+                status, _, body = self.request('GET', path)
+                self.assertEqual(status, 400)
+                self.assertTrue(body['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Tests for the Idempotency-Key response cache.
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.idempotency import IdempotencyCache
+
+
+class TestIdempotencyCache(unittest.TestCase):
+
+    def test_retry_replays_stored_response(self):
+        cache = IdempotencyCache()
+        entry, is_owner = cache.begin('admin:key', 'body-hash')
+        self.assertTrue(is_owner)
+        cache.complete('admin:key', entry, 201, {'id': 1})
+
+        again, is_owner = cache.begin('admin:key', 'body-hash')
+        self.assertFalse(is_owner)
+        self.assertIs(again, entry)
+        self.assertTrue(cache.wait(again, timeout=0))
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_different_body_is_a_conflict(self):
+        cache = IdempotencyCache()
+        cache.begin('admin:key', 'body-a')
+        entry, is_owner = cache.begin('admin:key', 'body-b')
+        self.assertFalse(is_owner)
+        self.assertEqual(entry.fingerprint, 'body-a')
+        self.assertEqual(cache.stats()['conflicts'], 1)
+
+    def test_expired_key_can_be_reused(self):
+        cache = IdempotencyCache(ttl_seconds=0)
+        first, _ = cache.begin('admin:key', 'body')
+        second, is_owner = cache.begin('admin:key', 'body')
+        self.assertTrue(is_owner)
+        self.assertIsNot(first, second)
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_oldest_keys_are_evicted_first(self):
+        cache = IdempotencyCache(max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.begin(key, 'body')
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['size'], 2)
+        _, is_owner = cache.begin('a', 'body')
+        self.assertTrue(is_owner)  # 'a' was evicted
+        _, is_owner = cache.begin('c', 'body')
+        self.assertFalse(is_owner)
+
+    def test_abandoned_key_can_be_retried(self):
+        cache = IdempotencyCache()
+        entry, _ = cache.begin('admin:key', 'body')
+        cache.abandon('admin:key', entry)
+        self.assertFalse(cache.wait(entry, timeout=0))
+        _, is_owner = cache.begin('admin:key', 'body')
+        self.assertTrue(is_owner)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Tests for the streaming bulk import: reading Content-Length and chunked
+bodies, incremental XML/NDJSON parsing and POST /transactions/import.
+"""
+
+import io
+import json
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.ingest import iter_request_body, iter_xml_records, iter_ndjson_records
+from server_harness import ServerTestCase
+
+
+XML_UPLOAD = b'''<?xml version="1.0"?>
+<transactions>
+  <transaction><type>Send Money</type><amount>5000</amount>
+    <sender>250780000001</sender><receiver>250780000002</receiver></transaction>
+  <transaction><type>Airtime</type><amount> 100 </amount>
+    <sender>250780000003</sender><receiver></receiver></transaction>
+</transactions>
+'''
+
+
+def split(data, size):
+    """Cut bytes into pieces of `size`, like reads off a socket."""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestIterRequestBody(unittest.TestCase):
+
+    def test_content_length_body(self):
+        rfile = io.BytesIO(b'hello world, and the next request')
+        pieces = list(iter_request_body(rfile, {'Content-Length': '11'}, chunk_size=4))
+        self.assertEqual(pieces, [b'hell', b'o wo', b'rld'])
+        self.assertEqual(rfile.read(), b', and the next request')
+
+    def test_chunked_body_with_extension_and_trailer(self):
+        rfile = io.BytesIO(b'5\r\nhello\r\n7;ext=1\r\n, world\r\n0\r\nX-Trailer: 1\r\n\r\nNEXT')
+        pieces = list(iter_request_body(rfile, {'Transfer-Encoding': 'chunked'}, chunk_size=4))
+        self.assertEqual(b''.join(pieces), b'hello, world')
+        self.assertTrue(all(len(piece) <= 4 for piece in pieces))
+        self.assertEqual(rfile.read(), b'NEXT')
+
+    def test_truncated_uploads_raise(self):
+        cases = [
+            ({'Content-Length': '10'}, b'short'),
+            ({'Transfer-Encoding': 'chunked'}, b'a\r\nshort'),
+            ({'Transfer-Encoding': 'chunked'}, b'5\r\nhello\r\n'),
+        ]
+        for headers, body in cases:
+            with self.subTest(body=body):
+                with self.assertRaises(ValueError):
+                    list(iter_request_body(io.BytesIO(body), headers))
+
+    def test_no_body(self):
+        self.assertEqual(list(iter_request_body(io.BytesIO(b''), {})), [])
+
+
+class TestRecordParsers(unittest.TestCase):
+
+    def test_xml_records_across_any_split(self):
+        expected = [
+            ({'type': 'Send Money', 'amount': '5000', 'sender': '250780000001',
+              'receiver': '250780000002'}, None),
+            ({'type': 'Airtime', 'amount': '100', 'sender': '250780000003', 'receiver': ''}, None),
+        ]
+        for size in (1, 7, len(XML_UPLOAD)):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_xml_records(split(XML_UPLOAD, size))), expected)
+
+    def test_malformed_xml_raises_after_earlier_records(self):
+        records = iter_xml_records([b'<t><transaction><type>A</type></transaction><oops></t>'])
+        self.assertEqual(next(records), ({'type': 'A'}, None))
+        with self.assertRaises(ValueError):
+            next(records)
+
+    def test_ndjson_bad_lines_are_reported_not_raised(self):
+        upload = b'{"amount": 1}\n\nnot json\n[1, 2]\n{"amount": 2}'
+        results = list(iter_ndjson_records(split(upload, 3)))
+        self.assertEqual([record for record, _ in results], [{'amount': 1}, None, None, {'amount': 2}])
+        self.assertEqual([error is None for _, error in results], [True, False, False, True])
+
+
+class TestImportEndpoint(ServerTestCase):
+
+    def ndjson(self, records):
+        return ''.join((json.dumps(r) if isinstance(r, dict) else r) + '\n' for r in records).encode()
+
+    def test_summary_counts_accepted_and_rejected(self):
+        body = self.ndjson([
+            {'type': 'Send Money', 'amount': 100, 'sender': '1', 'receiver': '2'},
+            {'type': 'Send Money', 'amount': 'NaN', 'sender': '1', 'receiver': '2'},
+            {'type': 'Send Money', 'sender': '1', 'receiver': '2'},
+            'not json',
+            {'type': 'Airtime', 'amount': '250.5', 'sender': '3', 'receiver': '4'},
+        ])
+        status, _, response = self.request('POST', '/transactions/import', body,
+                                           {'Content-Type': 'application/x-ndjson'})
+        self.assertEqual(status, 201)
+        summary = response['data']
+        self.assertEqual((summary['records_read'], summary['accepted'], summary['rejected']), (5, 2, 3))
+        self.assertEqual([error['record'] for error in summary['errors']], [2, 3, 4])
+        self.assertIn('amount', summary['errors'][1]['message'])
+        self.assertEqual(summary['bytes_received'], len(body))
+
+        _, _, listing = self.request('GET', '/transactions?sender_prefix=3')
+        self.assertEqual([t['amount'] for t in listing['data']], [250.5])
+        self.assertEqual(len(listing['data']), 1)
+
+    def test_chunked_xml_upload(self):
+        status, _, response = self.request('POST', '/transactions/import', iter(split(XML_UPLOAD, 50)),
+                                           {'Content-Type': 'application/xml'})
+        self.assertEqual(status, 201)
+        self.assertEqual(response['data']['accepted'], 2)
+
+        _, _, listing = self.request('GET', '/transactions')
+        self.assertEqual(len(listing['data']), len(self.transactions) + 2)
+        self.assertEqual(listing['data'][-1]['id'], len(self.transactions) + 2)
+
+    def test_malformed_xml_keeps_batches_inserted_before_the_error(self):
+        self.patch_server('IMPORT_BATCH_SIZE', 1)
+        body = [b'<t><transaction><type>A</type><amount>1</amount><sender>9</sender>'
+                b'<receiver>2</receiver></transaction>', b'<oops></t>']
+        status, _, response = self.request('POST', '/transactions/import', iter(body),
+                                           {'Content-Type': 'application/xml'})
+        self.assertEqual(status, 400)
+        self.assertIn('Invalid XML', response['message'])
+        self.assertEqual(response['data']['accepted'], 1)
+
+        _, _, listing = self.request('GET', '/transactions?sender_prefix=9')
+        self.assertEqual([t['type'] for t in listing['data']], ['A'])
+
+    def test_unknown_content_type_is_a_415(self):
+        status, _, _ = self.request('POST', '/transactions/import', b'a,b', {'Content-Type': 'text/csv'})
+        self.assertEqual(status, 415)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for the sampling request profiler.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.profiler import RequestProfiler
+
+
+def busy_request():
+    return sorted(range(2000), reverse=True)
+
+
+def busy_other_thread(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(1000))
+
+
+class TestRequestProfiler(unittest.TestCase):
+
+    def test_forced_profile_is_saved_per_route(self):
+        output_dir = tempfile.mkdtemp()
+        profiler = RequestProfiler(output_dir)
+        request_profile = profiler.start(forced=True)
+        busy_request()
+        profiler.finish(request_profile, 'GET /transactions/{id}', forced=True)
+
+        self.assertEqual(os.listdir(output_dir), ['GET_transactions_id.prof'])
+        self.assertEqual(profiler.stats()['routes'], {'GET /transactions/{id}': 1})
+
+    def test_not_sampled_when_disabled(self):
+        profiler = RequestProfiler(tempfile.mkdtemp(), sample_rate=1.0, enabled=False)
+        self.assertIsNone(profiler.start())
+
+    def test_only_the_request_thread_is_recorded(self):
+        profiler = RequestProfiler(tempfile.mkdtemp())
+        other = threading.Thread(target=busy_other_thread, args=(0.2,))
+        request_profile = profiler.start(forced=True)
+        other.start()
+        busy_request()
+        other.join()
+        profiler.finish(request_profile, 'GET /x', forced=True)
+
+        functions = {name for _, _, name in profiler._stats['GET /x'].stats}
+        self.assertIn('busy_request', functions)
+        self.assertNotIn('busy_other_thread', functions)
+
+    def test_save_errors_are_counted_not_raised(self):
+        blocker = tempfile.NamedTemporaryFile()
+        profiler = RequestProfiler(os.path.join(blocker.name, 'profiles'))  # parent is a file
+        request_profile = profiler.start(forced=True)
+        profiler.finish(request_profile, 'GET /x', forced=True)
+
+        self.assertEqual(profiler.stats()['save_errors'], 1)
+        # The busy lock was released, so the next request can be profiled
+        request_profile = profiler.start(forced=True)
+        self.assertIsNotNone(request_profile)
+        request_profile.disable()
+
+
+if __name__ == '__main__':
+    unittest.main()
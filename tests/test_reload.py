@@ -0,0 +1,131 @@
+"""
+Tests for live reload: diffing two versions of the XML file and applying
+the diff without undoing changes made through the API.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import server
+from api.reload import XMLReloader, diff_snapshots
+from server_harness import ServerTestCase, make_transaction
+
+
+def write_xml(path, transactions):
+    """Write transactions in the same format as data/transactions.xml."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<transactions>\n')
+        for t in transactions:
+            f.write(f'  <transaction id="{t["id"]}">')
+            for field in ('type', 'amount', 'sender', 'receiver', 'timestamp', 'status'):
+                f.write(f'<{field}>{t[field]}</{field}>')
+            f.write('</transaction>\n')
+        f.write('</transactions>\n')
+
+
+class TestDiffSnapshots(unittest.TestCase):
+
+    def test_added_changed_and_removed(self):
+        old = {i: make_transaction(i, 100 * i) for i in (1, 2, 3)}
+        new = {1: make_transaction(1, 100), 2: make_transaction(2, 999), 4: make_transaction(4, 400)}
+        added, changed, removed = diff_snapshots(old, new)
+        self.assertEqual([t['id'] for t in added], [4])
+        self.assertEqual([(t['id'], t['amount']) for t in changed], [(2, 999.0)])
+        self.assertEqual(removed, [3])
+
+    def test_same_file_is_no_change(self):
+        records = {i: make_transaction(i, i) for i in range(1, 4)}
+        self.assertEqual(diff_snapshots(records, {i: dict(t) for i, t in records.items()}), ([], [], []))
+
+
+class TestApplyReload(ServerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.xml_path = os.path.join(directory, 'transactions.xml')
+
+        self.file_records = [dict(t) for t in self.transactions]
+        write_xml(self.xml_path, self.file_records)
+        self.reloader = XMLReloader(self.xml_path, server.apply_reload)
+        self.reloader.mark_loaded(self.file_records)
+
+    def reload(self):
+        write_xml(self.xml_path, self.file_records)
+        self.assertTrue(self.reloader.reload())
+        return self.reloader.last_reload
+
+    def test_file_changes_are_applied_and_invalidate_the_cache(self):
+        self.request('GET', '/transactions/2')
+        self.file_records[1]['status'] = 'reversed'
+        del self.file_records[2]
+        self.file_records.append(make_transaction(40, 4000))
+
+        counts = self.reload()
+        self.assertEqual((counts['inserted'], counts['updated'], counts['deleted']), (1, 1, 1))
+        self.assertEqual(self.request('GET', '/transactions/2')[2]['data']['status'], 'reversed')
+        self.assertEqual(self.request('GET', '/transactions/3')[0], 404)
+        self.assertEqual(self.request('GET', '/transactions/40')[0], 200)
+
+        _, _, feed = self.request('GET', '/transactions/changes?since=0')
+        self.assertEqual(sorted((c['op'], c['id']) for c in feed['changes']),
+                         [('create', 40), ('delete', 3), ('update', 2)])
+
+    def test_api_deleted_record_stays_deleted(self):
+        self.request('DELETE', '/transactions/2')
+        self.file_records[1]['amount'] = 123.0  # the file still has it, and changes it
+
+        counts = self.reload()
+        self.assertEqual(counts['updated'], 0)
+        self.assertEqual(self.request('GET', '/transactions/2')[0], 404)
+
+    def test_api_edit_of_a_record_the_file_did_not_change_is_kept(self):
+        self.request('PUT', '/transactions/4', {'status': 'refunded'})
+        self.file_records[0]['status'] = 'failed'
+
+        self.reload()
+        self.assertEqual(self.request('GET', '/transactions/4')[2]['data']['status'], 'refunded')
+        self.assertEqual(self.request('GET', '/transactions/1')[2]['data']['status'], 'failed')
+
+    def test_id_conflict_keeps_the_api_record_and_retries_later(self):
+        status, _, created = self.request('POST', '/transactions', {
+            'type': 'Send Money', 'amount': 10, 'sender': 'api', 'receiver': 'x'})
+        self.assertEqual((status, created['data']['id']), (201, 6))
+        self.file_records.append(make_transaction(6, 600, sender='file'))
+
+        counts = self.reload()
+        self.assertEqual((counts['inserted'], counts['conflicts']), (0, 1))
+        self.assertEqual(self.request('GET', '/transactions/6')[2]['data']['sender'], 'api')
+        self.assertNotIn(6, self.reloader.snapshot)
+
+        # Once the API record is gone the file's version goes in
+        self.request('DELETE', '/transactions/6')
+        counts = self.reload()
+        self.assertEqual((counts['inserted'], counts['conflicts']), (1, 0))
+        self.assertEqual(self.request('GET', '/transactions/6')[2]['data']['sender'], 'file')
+
+    def test_new_ids_come_after_ids_the_file_added(self):
+        self.file_records.append(make_transaction(50, 5000))
+        self.reload()
+
+        _, _, created = self.request('POST', '/transactions', {
+            'type': 'Send Money', 'amount': 10, 'sender': 'api', 'receiver': 'x'})
+        self.assertEqual(created['data']['id'], 51)
+
+    def test_broken_file_keeps_the_old_data(self):
+        with open(self.xml_path, 'w') as f:
+            f.write('<transactions><transaction id="1">')
+        self.assertFalse(self.reloader.reload())
+        self.assertEqual(self.reloader.failures, 1)
+        self.assertEqual(len(server.transaction_store), len(self.transactions))
+
+
+if __name__ == '__main__':
+    unittest.main()
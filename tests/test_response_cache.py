@@ -0,0 +1,126 @@
+"""
+Tests for the per-record JSON cache: responses must be byte-for-byte what
+json.dumps(..., indent=2) gives, and changed or deleted records must never
+be served from it.
+"""
+
+import json
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import server
+from api.response_cache import RecordJSONCache, RECORDS_PLACEHOLDER, MAX_VARIANTS_PER_RECORD
+from server_harness import ServerTestCase, make_transaction
+
+
+def expected_bytes(envelope, data):
+    return json.dumps(dict(envelope, data=data), indent=2).encode('utf-8')
+
+
+class TestEncodeResponse(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = RecordJSONCache()
+        self.records = [make_transaction(1, 500), make_transaction(2, 2500.75, sender='café "x"')]
+        self.envelope = {'success': True, 'count': 2, 'data': RECORDS_PLACEHOLDER}
+
+    def test_list_matches_json_dumps(self):
+        for _ in range(2):  # cold, then from the cache
+            self.assertEqual(self.cache.encode_response(self.envelope, self.records),
+                             expected_bytes(self.envelope, self.records))
+        self.assertEqual(self.cache.stats()['hits'], 2)
+
+    def test_single_record_and_empty_list_match_json_dumps(self):
+        envelope = {'success': True, 'data': RECORDS_PLACEHOLDER}
+        self.assertEqual(self.cache.encode_response(envelope, self.records[1]),
+                         expected_bytes(envelope, self.records[1]))
+        self.assertEqual(self.cache.encode_response(envelope, []), expected_bytes(envelope, []))
+
+    def test_replaced_record_is_re_encoded(self):
+        self.cache.encode_response(self.envelope, self.records)
+        self.records[0] = dict(self.records[0], status='refunded')
+        self.assertEqual(self.cache.encode_response(self.envelope, self.records),
+                         expected_bytes(self.envelope, self.records))
+
+    def test_record_deleted_while_being_read_is_not_kept(self):
+        store = {1: self.records[0]}
+        cache = RecordJSONCache(is_current=lambda record: store.get(record['id']) is record)
+        del store[1]  # deleted after the reader took its snapshot
+        self.assertEqual(cache.encode_response(self.envelope, self.records[:1]),
+                         expected_bytes(self.envelope, self.records[:1]))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_projection_matches_json_dumps(self):
+        fields = ('amount', 'id')
+        projected = [{'amount': r['amount'], 'id': r['id']} for r in self.records]
+        self.assertEqual(self.cache.encode_response(self.envelope, self.records, fields),
+                         expected_bytes(self.envelope, projected))
+        envelope = {'success': True, 'data': RECORDS_PLACEHOLDER}
+        self.assertEqual(self.cache.encode_response(envelope, self.records[0], fields),
+                         expected_bytes(envelope, projected[0]))
+
+        # The full record is still encoded in full afterwards
+        self.assertEqual(self.cache.encode_response(self.envelope, self.records),
+                         expected_bytes(self.envelope, self.records))
+
+    def test_variants_per_record_are_capped(self):
+        for depth in range(20):
+            self.cache.get(self.records[0], depth)
+        self.assertEqual(len(self.cache._entries[1][1]), MAX_VARIANTS_PER_RECORD)
+
+
+class TestCachedEndpoints(ServerTestCase):
+
+    def test_cached_and_uncached_responses_are_identical(self):
+        paths = ['/transactions', '/transactions/3', '/transactions?sort=amount&order=desc&limit=2']
+        cached = [self.request('GET', path, raw=True)[2] for path in paths * 2]
+
+        self.patch_server('response_cache', RecordJSONCache(enabled=False))
+        for path, body in zip(paths * 2, cached):
+            with self.subTest(path=path):
+                self.assertEqual(body, self.request('GET', path, raw=True)[2])
+
+    def test_put_and_delete_invalidate(self):
+        self.request('GET', '/transactions')
+        self.request('PUT', '/transactions/2', {'status': 'refunded'})
+        self.request('DELETE', '/transactions/3')
+
+        _, _, single = self.request('GET', '/transactions/2')
+        self.assertEqual(single['data']['status'], 'refunded')
+        _, _, listing = self.request('GET', '/transactions')
+        self.assertEqual([(t['id'], t['status']) for t in listing['data'][:3]],
+                         [(1, 'completed'), (2, 'refunded'), (4, 'completed')])
+        self.assertEqual(self.request('GET', '/transactions/3')[0], 404)
+        self.assertNotIn(3, server.response_cache._entries)
+
+    def test_fields_projection(self):
+        status, _, listing = self.request('GET', '/transactions?fields=id,amount&limit=2')
+        self.assertEqual(status, 200)
+        self.assertEqual(listing['data'], [{'id': 1, 'amount': 1000.0}, {'id': 2, 'amount': 2000.0}])
+
+        _, _, single = self.request('GET', '/transactions/4?fields=status')
+        self.assertEqual(single['data'], {'status': 'completed'})
+
+        # Every field listed is the same as no ?fields= at all
+        all_fields = ','.join(self.transactions[0])
+        self.assertEqual(self.request('GET', '/transactions/4?fields=' + all_fields, raw=True)[2],
+                         self.request('GET', '/transactions/4', raw=True)[2])
+
+    def test_projected_response_sees_updates(self):
+        self.request('GET', '/transactions/2?fields=status')
+        self.request('PUT', '/transactions/2', {'status': 'refunded'})
+        _, _, single = self.request('GET', '/transactions/2?fields=status')
+        self.assertEqual(single['data'], {'status': 'refunded'})
+
+    def test_unknown_field_is_a_400(self):
+        status, _, body = self.request('GET', '/transactions?fields=id,balance')
+        self.assertEqual(status, 400)
+        self.assertIn('balance', body['message'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Tests for the sharded transaction store and the server code that writes to it.
+Run with: python -m unittest discover tests   (or python -m pytest tests)
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dsa.sharded_store import ShardedStore, build_sharded_store
+from api import server
+
+
+def make_transaction(transaction_id, amount, sender='250780000001', receiver='250780000002'):
+    return {
+        'id': transaction_id,
+        'type': 'Send Money',
+        'amount': float(amount),
+        'sender': sender,
+        'receiver': receiver,
+        'timestamp': '',
+        'status': 'completed'
+    }
+
+
+class TestShardedStore(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(42)
+        self.transactions = [
+            make_transaction(i, rng.choice([100, 500, 500, 2500, 10000, rng.randrange(1, 10 ** 6)]),
+                             sender=f'2507{rng.randrange(10 ** 8):08d}')
+            for i in rng.sample(range(1, 2000), 300)
+        ]
+        self.store = build_sharded_store(self.transactions, num_shards=7)
+
+    def reference(self, sender_prefix=None, min_amount=None, max_amount=None,
+                  sort=None, descending=False, limit=None):
+        """What search() should return, computed the slow way."""
+        results = [t for t in self.transactions
+                   if (sender_prefix is None or t['sender'].startswith(sender_prefix))
+                   and (min_amount is None or t['amount'] >= min_amount)
+                   and (max_amount is None or t['amount'] <= max_amount)]
+        if sort == 'amount':
+            results.sort(key=lambda t: (t['amount'], t['id']), reverse=descending)
+        else:
+            results.sort(key=lambda t: t['id'])
+        return results[:limit] if limit is not None else results
+
+    def test_snapshot_is_in_id_order(self):
+        self.assertEqual(self.store.snapshot(), sorted(self.transactions, key=lambda t: t['id']))
+
+    def test_iter_snapshot_is_not_affected_by_later_writes(self):
+        rows = self.store.iter_snapshot()
+        first = next(rows)
+        removed = self.store.snapshot()[-1]
+        shard = self.store.shard_for(removed['id'])
+        with shard.lock:
+            shard.remove(removed['id'])
+        self.assertEqual([first] + list(rows), sorted(self.transactions, key=lambda t: t['id']))
+
+    def test_search_merges_shards_in_stable_order(self):
+        cases = [
+            {},
+            {'limit': 5},
+            {'sender_prefix': '25071'},
+            {'sender_prefix': '25071', 'limit': 3},
+            {'sender_prefix': '2507', 'limit': 3},
+            {'min_amount': 500, 'max_amount': 10000},
+            {'sort': 'amount'},
+            {'sort': 'amount', 'descending': True, 'limit': 10},
+            {'sort': 'amount', 'min_amount': 500, 'limit': 4},
+        ]
+        for kwargs in cases:
+            with self.subTest(**kwargs):
+                self.assertEqual(self.store.search(**kwargs), self.reference(**kwargs))
+
+    def test_order_does_not_depend_on_shard_count(self):
+        one_shard = build_sharded_store(self.transactions, num_shards=1)
+        for kwargs in ({}, {'sort': 'amount', 'descending': True}, {'min_amount': 1000}):
+            with self.subTest(**kwargs):
+                self.assertEqual(one_shard.search(**kwargs), self.store.search(**kwargs))
+
+    def test_replace_and_remove_update_the_indexes(self):
+        transaction = self.transactions[0]
+        shard = self.store.shard_for(transaction['id'])
+        with shard.lock:
+            shard.replace(dict(transaction, amount=123456789.0, sender='999'))
+        self.assertEqual([t['id'] for t in self.store.search(sender_prefix='999')], [transaction['id']])
+        self.assertEqual(self.store.search(sort='amount', descending=True, limit=1)[0]['id'], transaction['id'])
+
+        with shard.lock:
+            self.assertIsNotNone(shard.remove(transaction['id']))
+            self.assertIsNone(shard.remove(transaction['id']))
+        self.assertIsNone(self.store.get(transaction['id']))
+        self.assertEqual(self.store.search(sender_prefix='999'), [])
+        self.assertNotIn(transaction['id'], [t['id'] for t in self.store.snapshot()])
+
+    def test_ids_continue_after_the_highest_loaded_id(self):
+        highest = max(t['id'] for t in self.transactions)
+        self.assertEqual(self.store.allocate_id(), highest + 1)
+
+    def test_reserve_ids_only_moves_forward(self):
+        store = ShardedStore(num_shards=4)
+        store.reserve_ids(10)
+        store.reserve_ids(5)
+        self.assertGreater(store.allocate_id(), 10)
+
+    def test_reserving_a_lower_id_after_allocating_does_not_reuse_ids(self):
+        # Regression: reserve_ids used to reset the counter to highest_id + 1
+        store = build_sharded_store([make_transaction(i, i) for i in range(1, 21)], num_shards=4)
+        allocated = [store.allocate_id() for _ in range(100)]
+        store.reserve_ids(30)
+        self.assertGreater(store.allocate_id(), max(allocated))
+
+    def test_reserve_ids_skips_past_a_higher_id(self):
+        store = ShardedStore(num_shards=4)
+        store.allocate_id()
+        store.reserve_ids(1000)
+        self.assertEqual(store.allocate_id(), 1001)
+
+    def test_search_skips_stale_index_entries(self):
+        shard = self.store.shards[0]
+        shard.amount_index.insert(50.0, 999999)  # ID with no record
+        shard.sender_index.insert('25070', 999999)
+        self.assertEqual(self.store.search(min_amount=0), self.reference(min_amount=0))
+        self.assertEqual(self.store.search(sender_prefix='2507'), self.reference(sender_prefix='2507'))
+
+
+class TestAddTransactions(unittest.TestCase):
+
+    def setUp(self):
+        self.original_store = server.transaction_store
+        server.transaction_store = ShardedStore(num_shards=4, first_id=10)
+
+    def tearDown(self):
+        server.transaction_store = self.original_store
+
+    def test_allocated_id_already_taken_is_retried(self):
+        # As if a reload had inserted ID 10 between allocation and insert
+        store = server.transaction_store
+        store.shard_for(10).add(make_transaction(10, 1))
+
+        data = [{'type': 'Deposit', 'amount': i, 'sender': '1', 'receiver': '2'} for i in range(3)]
+        stored = server.add_transactions(data)
+
+        self.assertEqual(sorted(t['id'] for t in stored), [11, 12, 13])
+        self.assertEqual(store.get(10)['amount'], 1.0)
+        self.assertEqual(len(store), 4)
+
+    def test_many_taken_ids_are_retried_without_recursion(self):
+        store = server.transaction_store
+        for transaction_id in range(10, 5010):
+            store.shard_for(transaction_id).add(make_transaction(transaction_id, 1))
+
+        stored = server.add_transaction({'type': 'Deposit', 'amount': 1, 'sender': '1', 'receiver': '2'})
+        self.assertEqual(stored['id'], 5010)
+
+    def test_ids_are_unique_across_threads(self):
+        import threading
+        data = {'type': 'Deposit', 'amount': 1, 'sender': '1', 'receiver': '2'}
+        threads = [threading.Thread(target=lambda: [server.add_transaction(dict(data)) for _ in range(200)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ids = [t['id'] for t in server.transaction_store.snapshot()]
+        self.assertEqual(len(ids), 800)
+        self.assertEqual(ids, list(range(10, 810)))
+
+
+if __name__ == '__main__':
+    unittest.main()
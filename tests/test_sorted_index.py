@@ -0,0 +1,88 @@
+"""
+Tests for the sorted amount index, and for keeping NaN/infinite amounts
+out of it.
+"""
+
+import math
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dsa.sorted_index import SortedIndex, build_sorted_index
+from dsa.sharded_store import build_sharded_store
+from api import server
+
+
+def make_transaction(transaction_id, amount):
+    return {
+        'id': transaction_id,
+        'type': 'Send Money',
+        'amount': amount,
+        'sender': '250780000001',
+        'receiver': '250780000002',
+        'timestamp': '',
+        'status': 'completed'
+    }
+
+
+class TestSortedIndex(unittest.TestCase):
+
+    def setUp(self):
+        amounts = [5000, 3000, 10000, 20000, 7500, 5000, 750000]
+        self.index = build_sorted_index(
+            [{'id': i, 'amount': amount} for i, amount in enumerate(amounts, start=1)], 'amount')
+
+    def test_range_is_inclusive_and_ordered(self):
+        self.assertEqual(list(self.index.range(5000, 10000)), [1, 6, 5, 3])
+        self.assertEqual(list(self.index.range(5000, 10000, descending=True)), [3, 5, 6, 1])
+        self.assertEqual(list(self.index.range(low=20000)), [4, 7])
+        self.assertEqual(list(self.index.range(high=3000)), [2])
+
+    def test_top(self):
+        self.assertEqual(self.index.top(3), [7, 4, 3])
+
+    def test_insert_and_remove(self):
+        self.index.insert(6000, 8)
+        self.assertEqual(list(self.index.range(5500, 6500)), [8])
+        self.index.remove(6000, 8)
+        self.index.remove(6000, 8)  # already gone
+        self.assertEqual(list(self.index.range(5500, 6500)), [])
+        self.assertEqual(len(self.index), 7)
+
+    def test_nan_entry_can_be_removed(self):
+        index = SortedIndex()
+        index.insert(1.0, 1)
+        index.insert(float('nan'), 2)
+        index.insert(3.0, 3)
+        index.remove(float('nan'), 2)
+        self.assertEqual([entry_id for _, entry_id in index.entries], [1, 3])
+
+
+class TestNonFiniteAmounts(unittest.TestCase):
+    """Regression: a NaN amount used to stay in the amount index after DELETE."""
+
+    def test_parse_amount_rejects_nan_and_infinity(self):
+        for value in (float('nan'), 'nan', 'NaN', float('inf'), '-inf', 'abc', None):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    server.parse_amount(value)
+        self.assertEqual(server.parse_amount('12.5'), 12.5)
+
+    def test_removed_nan_record_does_not_break_amount_queries(self):
+        store = build_sharded_store([make_transaction(i, 100.0 * i) for i in range(1, 5)], num_shards=1)
+        shard = store.shards[0]
+        with shard.lock:
+            shard.add(make_transaction(5, float('nan')))
+            shard.remove(5)
+
+        self.assertEqual(len(shard.amount_index), 4)
+        results = store.search(sort='amount', descending=True, limit=3)
+        self.assertEqual([t['id'] for t in results], [4, 3, 2])
+        self.assertFalse(any(math.isnan(t['amount']) for t in store.search(min_amount=0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
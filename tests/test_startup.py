@@ -0,0 +1,82 @@
+"""
+Tests for startup: the probes answer while the data loads in the
+background, and a failed load leaves the server not-ready.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import server
+from api.reload import XMLReloader
+from server_harness import ServerTestCase
+
+
+class TestStartup(ServerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(server.data_ready.set)
+        server.data_ready.clear()
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.xml_path = os.path.join(directory, 'transactions.xml')
+
+        progress = dict(server.load_progress, state='loading', error=None, records_loaded=0)
+        self.patch_server('load_progress', progress)
+        self.patch_server('DATA_FILE', self.xml_path)
+        self.patch_server('RELOAD_ENABLED', False)
+        self.patch_server('reloader', XMLReloader(self.xml_path, server.apply_reload))
+
+    def test_probes_answer_before_the_data_is_loaded(self):
+        self.assertEqual(self.request('GET', '/healthz')[0], 200)
+
+        status, headers, body = self.request('GET', '/readyz')
+        self.assertEqual(status, 503)
+        self.assertEqual(headers['Retry-After'], '1')
+        self.assertEqual((body['ready'], body['data']['state']), (False, 'loading'))
+
+    def test_data_endpoints_wait_for_the_load(self):
+        for method, path in (('GET', '/transactions'), ('POST', '/transactions'),
+                             ('DELETE', '/transactions/1')):
+            with self.subTest(method=method, path=path):
+                status, headers, _ = self.request(method, path, {} if method == 'POST' else None)
+                self.assertEqual(status, 503)
+                self.assertEqual(headers['Retry-After'], '1')
+        self.assertEqual(self.request('GET', '/stats')[0], 200)
+
+    def test_successful_load_becomes_ready(self):
+        with open(self.xml_path, 'w') as f:
+            f.write('<transactions><transaction id="7"><type>Airtime</type><amount>100</amount>'
+                    '<sender>1</sender><receiver>2</receiver></transaction></transactions>')
+        server.load_data_in_background()
+
+        status, _, body = self.request('GET', '/readyz')
+        self.assertEqual(status, 200)
+        self.assertEqual((body['data']['state'], body['data']['records_loaded']), ('ready', 1))
+        self.assertEqual(body['data']['percent'], 100.0)
+        self.assertEqual(self.request('GET', '/transactions/7')[2]['data']['type'], 'Airtime')
+
+    def test_failed_load_is_reported_and_stays_not_ready(self):
+        for contents in (None, '<transactions><transaction id="1">'):
+            with self.subTest(contents=contents):
+                if contents is not None:
+                    with open(self.xml_path, 'w') as f:
+                        f.write(contents)
+                server.load_data_in_background()
+
+                status, _, body = self.request('GET', '/readyz')
+                self.assertEqual(status, 503)
+                self.assertEqual(body['data']['state'], 'failed')
+                self.assertTrue(body['data']['error'])
+                self.assertEqual(self.request('GET', '/transactions')[0], 503)
+
+
+if __name__ == '__main__':
+    unittest.main()
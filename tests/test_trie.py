@@ -0,0 +1,54 @@
+"""
+Tests for the prefix trie used for sender/receiver prefix search.
+"""
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dsa.trie import PrefixTrie
+
+
+class TestPrefixTrie(unittest.TestCase):
+
+    def setUp(self):
+        self.trie = PrefixTrie()
+        self.trie.insert('250780000001', 1)
+        self.trie.insert('250780000002', 2)
+        self.trie.insert('250790000003', 3)
+        self.trie.insert(None, 4)  # missing keys are ignored
+
+    def test_search_by_prefix(self):
+        self.assertEqual(self.trie.search('25078'), {1, 2})
+        self.assertEqual(self.trie.search('2507'), {1, 2, 3})
+        self.assertEqual(self.trie.search(''), {1, 2, 3})
+        self.assertEqual(self.trie.search('9'), set())
+        self.assertEqual(len(self.trie), 3)
+
+    def test_search_returns_a_copy(self):
+        self.trie.search('25078').add(99)
+        self.assertEqual(self.trie.search('25078'), {1, 2})
+
+    def test_remove_prunes_empty_branches(self):
+        self.trie.remove('250790000003', 3)
+        self.assertEqual(self.trie.search('2507'), {1, 2})
+        self.assertNotIn('9', self.trie.root.children['2'].children['5'].children['0']
+                         .children['7'].children)
+
+        self.trie.remove('250780000001', 1)
+        self.trie.remove('250780000002', 2)
+        self.assertEqual(self.trie.root.children, {})
+        self.assertEqual(len(self.trie), 0)
+
+    def test_remove_unknown_key_or_id_is_ignored(self):
+        self.trie.remove('250780000001', 2)
+        self.trie.remove('123', 1)
+        self.assertEqual(self.trie.search('25078'), {1, 2})
+        self.assertEqual(len(self.trie), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()